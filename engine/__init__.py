@@ -0,0 +1,12 @@
+"""
+Headless engine behind the Streamlit pages, the CLI and the local HTTP API.
+
+Modules are imported individually (``from engine import data``) so that a page
+only loads the stack it needs:
+    engine.articles   article download, parsing and summarization
+    engine.data       CSV loading, cleaning and dashboard statistics
+    engine.sentiment  TextBlob and zero-shot scoring
+    engine.batch      streaming batches over worker pools
+    engine.cli        ``python -m engine`` command line
+    engine.server     local HTTP API
+"""
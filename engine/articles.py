@@ -0,0 +1,50 @@
+"""
+News article download, parsing and summarization.
+"""
+from utils.lazy import lazy_import
+from utils.resources import manager
+from utils.tracing import trace
+
+# newspaper pulls in nltk and lxml, so load it only once an article is requested
+newspaper = lazy_import("newspaper")
+
+
+def parse_article(url):
+    """
+    Download, parse and summarize an article, keeping only the fields the page shows.
+    """
+    article = newspaper.Article(url)
+    with trace("article_download"):
+        article.download()
+        article.parse()
+    # items counts articles (one per call)
+    with trace("article_nlp", items=1):
+        article.nlp()
+
+    embbed_urls = article.meta_data.get('og', {}).get('image', '')
+    if isinstance(embbed_urls, dict):
+        image_url = embbed_urls.get('identifier', '')
+    else:
+        image_url = embbed_urls
+
+    return {
+        'url': url,
+        'authors': article.authors,
+        'publish_date': article.publish_date,
+        'title': article.title,
+        'keywords': article.keywords,
+        'link': article.meta_data.get('og', {}).get('url', ''),
+        'image_url': image_url,
+        'text': article.text,
+        'summary': article.summary,
+    }
+
+
+def summarize_article(url):
+    """
+    Return the parsed article for ``url``, shared across sessions.
+
+    For the Streamlit page; batch jobs call ``parse_article`` so articles they
+    never read again do not fill the shared cache.
+    """
+    return manager.get_or_create(f"article:{url}", lambda: parse_article(url))
@@ -0,0 +1,97 @@
+"""
+Streaming batch execution over worker pools.
+
+``map_batches`` splits an iterable into batches, runs them on a thread or
+process pool and yields the results in input order while keeping only a
+bounded number of batches in flight, so arbitrarily large inputs can be
+streamed with constant memory.
+
+Tracing totals recorded in worker processes are sent back with each result and
+merged into the parent, which is the only process writing the Prometheus
+textfile.
+"""
+import functools
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from utils import tracing
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def iter_batches(iterable, batch_size):
+    """
+    Yield lists of at most ``batch_size`` items.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _init_worker():
+    # Forked workers start with a copy of the parent's totals
+    tracing.take_totals()
+
+
+def _call_in_worker(func, batch):
+    return func(batch), tracing.take_totals()
+
+
+def map_batches(func, batches, workers=None, executor="thread", prefetch=2):
+    """
+    Apply ``func`` to each batch on a worker pool, yielding results in order.
+
+    Parameters:
+    -----------
+    func : callable
+        Called once per batch. Must be picklable for ``executor="process"``.
+
+    batches : iterable
+        Batches to process, e.g. from ``iter_batches`` or ``pd.read_csv(chunksize=...)``.
+
+    workers : int
+        Pool size (defaults to the CPU count). With ``workers=1`` the batches
+        are processed inline, without a pool.
+
+    executor : str
+        "thread" for I/O-bound work (downloads, model calls that release the
+        GIL), "process" for CPU-bound pure-Python work such as TextBlob.
+
+    prefetch : int
+        Batches queued per worker ahead of the one being consumed.
+    """
+    workers = workers or default_workers()
+    if workers == 1:
+        for batch in batches:
+            yield func(batch)
+        return
+
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        submit = functools.partial(pool.submit, _call_in_worker, func)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        submit = functools.partial(pool.submit, func)
+
+    def result(future):
+        if executor != "process":
+            return future.result()
+        value, totals = future.result()
+        tracing.merge_totals(totals)
+        return value
+
+    with pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(submit(batch))
+            if len(pending) >= workers * prefetch:
+                yield result(pending.popleft())
+        while pending:
+            yield result(pending.popleft())
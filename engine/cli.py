@@ -0,0 +1,164 @@
+"""
+Command line interface for bulk jobs, without Streamlit.
+
+Usage:
+    python -m engine summarize URL [URL ...] | --urls-file urls.txt
+    python -m engine sentiment data.csv --column text [--method zero-shot] [-o out.csv]
+    python -m engine profile data.csv [--keep-duplicates] [--missing fill_mean]
+    python -m engine serve [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import functools
+import json
+import sys
+
+import pandas as pd
+
+from engine import articles, data, sentiment
+from engine.batch import default_workers, iter_batches, map_batches
+
+
+def _summarize_one(url):
+    # Not through the shared cache: a batch never reads an article twice, and
+    # caching would hold up to the whole memory budget of article dicts
+    try:
+        return articles.parse_article(url)
+    except Exception as e:
+        return {"url": url, "error": str(e)}
+
+
+def summarize_urls(urls, workers=None):
+    """
+    Yield parsed articles for ``urls`` in order, downloading them concurrently.
+    """
+    batches = map_batches(
+        lambda batch: [_summarize_one(url) for url in batch],
+        iter_batches(urls, 1),
+        workers=workers or min(16, 4 * default_workers()),
+        executor="thread",
+    )
+    for batch in batches:
+        yield from batch
+
+
+def _textblob_chunk(chunk, column):
+    results = sentiment.score_batch(chunk[column].tolist())
+    chunk = chunk.copy()
+    chunk["Sentiment Score"] = [polarity for polarity, _ in results]
+    chunk["Analysis"] = [label for _, label in results]
+    return chunk
+
+
+def _zero_shot_chunk(chunk, column, batch_size):
+    chunk = chunk.copy()
+    chunk["Predicted_Sentiment"] = sentiment.classify_batch(chunk[column].tolist(), batch_size=batch_size)
+    return chunk
+
+
+def score_csv(path, column, method="textblob", chunksize=5000, workers=None, batch_size=16):
+    """
+    Yield scored DataFrame chunks of the CSV at ``path``, in order.
+
+    TextBlob chunks run on a process pool; zero-shot chunks share one model
+    in-process and run on threads (the model releases the GIL). Raises
+    ValueError before any worker starts if ``column`` is not in the header.
+    """
+    columns = pd.read_csv(path, encoding="latin1", nrows=0).columns.tolist()
+    if column not in columns:
+        raise ValueError(f"Column {column!r} not found in {path}. Available columns: {', '.join(columns)}")
+    # Every column is read as the original text, so pass-through values are
+    # written back unchanged instead of depending on each chunk's inferred dtypes
+    chunks = pd.read_csv(path, encoding="latin1", chunksize=chunksize, dtype=str, keep_default_na=False)
+    if method == "textblob":
+        func = functools.partial(_textblob_chunk, column=column)
+        return map_batches(func, chunks, workers=workers, executor="process")
+    func = functools.partial(_zero_shot_chunk, column=column, batch_size=batch_size)
+    return map_batches(func, chunks, workers=workers or 1, executor="thread")
+
+
+def _read_urls(args):
+    urls = list(args.urls)
+    if args.urls_file:
+        stream = sys.stdin if args.urls_file == "-" else open(args.urls_file, encoding="utf-8")
+        with stream:
+            urls.extend(line.strip() for line in stream if line.strip())
+    return urls
+
+
+def cmd_summarize(args):
+    urls = _read_urls(args)
+    if not urls:
+        sys.exit("No URLs given.")
+    failed = 0
+    for article in summarize_urls(urls, workers=args.workers):
+        failed += "error" in article
+        print(json.dumps(article, default=str), flush=True)
+    return 1 if failed else 0
+
+
+def cmd_sentiment(args):
+    try:
+        chunks = score_csv(args.csv, args.column, args.method, args.chunksize, args.workers, args.batch_size)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    rows = 0
+    with out:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(out, index=False, header=(i == 0))
+            rows += len(chunk)
+    print(f"Scored {rows} rows.", file=sys.stderr)
+    return 0
+
+
+def cmd_profile(args):
+    df = data.load_data(args.csv)
+    df = data.clean_data(df, drop_duplicates=not args.keep_duplicates, drop_missing=args.missing)
+    print(json.dumps(data.profile(df), indent=2, default=str))
+    return 0
+
+
+def cmd_serve(args):
+    from engine.server import serve
+    serve(args.host, args.port, workers=args.workers)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Headless batch jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("summarize", help="download and summarize articles (JSON lines)")
+    p.add_argument("urls", nargs="*")
+    p.add_argument("--urls-file", help="file with one URL per line, '-' for stdin")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_summarize)
+
+    p = commands.add_parser("sentiment", help="score a text column of a CSV")
+    p.add_argument("csv")
+    p.add_argument("--column", default="text")
+    p.add_argument("--method", choices=["textblob", "zero-shot"], default="textblob")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("--chunksize", type=int, default=5000, help="rows read per chunk")
+    p.add_argument("--batch-size", type=int, default=16, help="zero-shot model batch size")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_sentiment)
+
+    p = commands.add_parser("profile", help="clean a CSV and print dashboard statistics as JSON")
+    p.add_argument("csv")
+    p.add_argument("--keep-duplicates", action="store_true")
+    p.add_argument("--missing", choices=data.MISSING_OPTIONS, default="none")
+    p.set_defaults(func=cmd_profile)
+
+    p = commands.add_parser("serve", help="run the local HTTP API")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,127 @@
+"""
+CSV loading, cleaning and profiling used by the Auto Dashboard and the CLI.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils.tracing import traced
+
+AGG_FUNCS = ["mean", "sum", "count", "max", "min"]
+MISSING_OPTIONS = ["none", "drop_rows", "fill_mean", "fill_zero"]
+
+
+@traced("load_data", items=len)
+def load_data(file):
+    """
+    Load CSV data using pandas and return a DataFrame.
+    """
+    df = pd.read_csv(file, encoding='latin1')
+    return df
+
+
+@traced("clean_data", items=len)
+def clean_data(df, drop_duplicates=True, drop_missing='none'):
+    """
+    Perform basic data cleaning on the DataFrame.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The input DataFrame to clean.
+
+    drop_duplicates : bool
+        Whether to drop duplicate rows.
+
+    drop_missing : str
+        How to handle missing values:
+        - 'none': do nothing
+        - 'drop_rows': drop any rows with missing values
+        - 'fill_mean': fill missing numeric values with column mean
+        - 'fill_zero': fill missing numeric values with 0
+
+    Returns:
+    --------
+    pd.DataFrame
+        The cleaned DataFrame.
+    """
+    # 1. Drop duplicates
+    if drop_duplicates:
+        df = df.drop_duplicates()
+
+    # 2. Handle missing values
+    #    (never in place, so a shared cached input frame is not mutated)
+    if drop_missing == 'drop_rows':
+        df = df.dropna()
+    elif drop_missing == 'fill_mean':
+        numeric_cols = df.select_dtypes(include=np.number).columns
+        df = df.fillna(df[numeric_cols].mean())
+    elif drop_missing == 'fill_zero':
+        numeric_cols = df.select_dtypes(include=np.number).columns
+        df = df.fillna({col: 0 for col in numeric_cols})
+
+    return df
+
+
+def column_types(df):
+    """
+    Split the columns into (categorical, numeric) name lists.
+    """
+    categorical_cols = df.select_dtypes(exclude=np.number).columns.tolist()
+    numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
+    return categorical_cols, numeric_cols
+
+
+@traced("describe")
+def describe(df):
+    return df.describe(include="all")
+
+
+@traced("missing_summary")
+def missing_summary(df):
+    missing_df = df.isna().sum().reset_index()
+    missing_df.columns = ["Column", "Missing Values"]
+    return missing_df
+
+
+@traced("group_by")
+def group_by(df, group_col, agg_col, agg_func):
+    return df.groupby(group_col)[agg_col].agg(agg_func)
+
+
+@traced("pivot_table")
+def pivot(df, index, values, aggfunc):
+    return pd.pivot_table(df, index=index, values=values, aggfunc=aggfunc)
+
+
+@traced("correlation")
+def correlation(df):
+    return df.corr(numeric_only=True)
+
+
+@traced("export_csv", items=len)
+def export_csv(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def _to_json(frame):
+    # pandas handles NaN, timestamps and numpy scalars; round-trip through its encoder
+    return json.loads(frame.to_json(orient="index", default_handler=str))
+
+
+def profile(df):
+    """
+    Return the dashboard statistics of ``df`` as a JSON-serializable dict.
+    """
+    categorical_cols, numeric_cols = column_types(df)
+    missing = missing_summary(df).set_index("Column")["Missing Values"]
+    return {
+        "rows": int(df.shape[0]),
+        "columns": int(df.shape[1]),
+        "dtypes": df.dtypes.astype(str).to_dict(),
+        "categorical_columns": categorical_cols,
+        "numeric_columns": numeric_cols,
+        "describe": _to_json(describe(df)),
+        "missing_values": {col: int(n) for col, n in missing.items()},
+    }
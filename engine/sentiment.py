@@ -0,0 +1,100 @@
+"""
+TextBlob polarity scoring and zero-shot classification.
+"""
+from utils.lazy import lazy_import
+from utils.resources import manager
+from utils.tracing import traced
+
+textblob = lazy_import("textblob")
+cleantext = lazy_import("cleantext")
+transformers = lazy_import("transformers")
+
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
+CANDIDATE_LABELS = ["positive", "negative", "neutral"]
+
+
+def textblob_sentiment(text):
+    """
+    Return (polarity, subjectivity) of ``text``, rounded to two decimals.
+    """
+    sentiment = textblob.TextBlob(text).sentiment
+    return round(sentiment.polarity, 2), round(sentiment.subjectivity, 2)
+
+
+def score(text):
+    """
+    Return the TextBlob polarity of ``text``, rounded to two decimals.
+    """
+    return round(textblob.TextBlob(str(text)).sentiment.polarity, 2)
+
+
+def analyze(polarity):
+    """
+    Map a polarity score to a Positive / Negative / Neutral label.
+    """
+    if polarity >= 0.5:
+        return "Positive"
+    elif polarity <= -0.5:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
+@traced("textblob_batch", items=len)
+def score_batch(texts):
+    """
+    Score a batch of texts with TextBlob and return ``[(polarity, label), ...]``.
+    """
+    results = []
+    for text in texts:
+        polarity = score(text)
+        results.append((polarity, analyze(polarity)))
+    return results
+
+
+def clean_text(text):
+    return cleantext.clean_words(
+        text,
+        clean_all=False,
+        lowercase=True,
+        stopwords=True,
+        extra_spaces=True,
+        numbers=True,
+        punct=True,
+        stp_lang="english"
+    )
+
+
+def load_zero_shot_classifier():
+    """
+    Load the zero-shot pipeline on first use and share it across sessions.
+
+    The model is pinned, so uploads filling the memory budget never evict it.
+    """
+    return manager.get_or_create(
+        f"model:{ZERO_SHOT_MODEL}",
+        lambda: transformers.pipeline("zero-shot-classification", model=ZERO_SHOT_MODEL),
+        pin=True,
+    )
+
+
+@traced("zero_shot_batch", items=len)
+def classify_batch(texts, candidate_labels=CANDIDATE_LABELS, batch_size=16):
+    """
+    Classify a batch of texts and return the top label of each.
+
+    The whole list is handed to the pipeline, which runs the model on
+    ``batch_size`` sequences at a time instead of one call per row.
+    """
+    texts = [str(text) for text in texts]
+    if not texts:
+        return []
+    classifier = load_zero_shot_classifier()
+    results = classifier(texts, candidate_labels, multi_label=False, batch_size=batch_size)
+    if isinstance(results, dict):
+        results = [results]
+    return [result["labels"][0] for result in results]
+
+
+def classify_text(text, candidate_labels=CANDIDATE_LABELS):
+    return classify_batch([text], candidate_labels)[0]
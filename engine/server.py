@@ -0,0 +1,134 @@
+"""
+Local HTTP API over the engine, using only the standard library.
+
+Endpoints (JSON in, JSON out):
+    GET  /health
+    POST /summarize   {"urls": [...]}
+    POST /sentiment   {"texts": [...], "method": "textblob" | "zero-shot"}
+    POST /profile     raw CSV body, optional ?drop_duplicates=0&missing=fill_mean
+"""
+import io
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from engine import data, sentiment
+from engine.cli import summarize_urls
+from utils.tracing import trace
+
+
+def _string_list(request, field, default=None):
+    """
+    Return ``request[field]`` if it is a list of strings, else raise ValueError
+    (answered with 400). A bare string would otherwise be iterated per character.
+    """
+    value = request.get(field, default)
+    if value is None:
+        raise ValueError(f"Missing field: {field!r}")
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{field!r} must be a list of strings")
+    return value
+
+
+def _missing_option(query):
+    """
+    Return the ``missing`` query value, raising ValueError (answered with 400)
+    for options ``clean_data`` would silently ignore.
+    """
+    missing = query.get("missing", ["none"])[0]
+    if missing not in data.MISSING_OPTIONS:
+        raise ValueError(f"Unknown missing option: {missing!r} (expected one of {', '.join(data.MISSING_OPTIONS)})")
+    return missing
+
+
+class EngineHandler(BaseHTTPRequestHandler):
+    server_version = "MultifuncEngine/1.0"
+    workers = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length)
+
+    def _read_json(self):
+        request = json.loads(self._read_body())
+        if not isinstance(request, dict):
+            raise ValueError("Expected a JSON object")
+        return request
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        routes = {
+            "/summarize": self._summarize,
+            "/sentiment": self._sentiment,
+            "/profile": self._profile,
+        }
+        handler = routes.get(url.path)
+        if handler is None:
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            with trace(f"api:{url.path.strip('/')}"):
+                payload = handler(parse_qs(url.query))
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+        else:
+            self._send_json(200, payload)
+
+    def _summarize(self, query):
+        urls = _string_list(self._read_json(), "urls")
+        return {"articles": list(summarize_urls(urls, workers=self.workers))}
+
+    def _sentiment(self, query):
+        request = self._read_json()
+        texts = _string_list(request, "texts")
+        method = request.get("method", "textblob")
+        if method == "textblob":
+            # Pure-Python and GIL-bound: concurrency comes from the request threads
+            results = [{"polarity": polarity, "label": label} for polarity, label in sentiment.score_batch(texts)]
+        elif method == "zero-shot":
+            labels = _string_list(request, "labels", sentiment.CANDIDATE_LABELS)
+            results = [{"label": label} for label in sentiment.classify_batch(texts, labels)]
+        else:
+            raise ValueError(f"Unknown method: {method!r}")
+        return {"results": results}
+
+    def _profile(self, query):
+        missing = _missing_option(query)
+        df = data.load_data(io.BytesIO(self._read_body()))
+        df = data.clean_data(
+            df,
+            drop_duplicates=query.get("drop_duplicates", ["1"])[0] != "0",
+            drop_missing=missing,
+        )
+        return data.profile(df)
+
+
+def serve(host="127.0.0.1", port=8765, workers=None):
+    """
+    Serve the API until interrupted. Each request is handled on its own thread.
+    """
+    EngineHandler.workers = workers
+    httpd = ThreadingHTTPServer((host, port), EngineHandler)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
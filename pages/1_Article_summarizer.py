@@ -1,5 +1,6 @@
 import streamlit as st
-import newspaper
+from engine.articles import summarize_article
+from utils.tracing import developer_panel
 
 def article_summarizer():
 
@@ -8,25 +9,17 @@ def article_summarizer():
     url = st.text_input('', placeholder="paste the URL here and press enter:")
     
     if url:
-        article = newspaper.Article(url)
-        article.download()
-        article.parse()
-        authors = article.authors
-        publish_date = article.publish_date
-        article_name = article.title
-        article.nlp()
-        links = article.meta_data.get('og', {}).get('url', '')
-        embbed_urls = article.meta_data.get('og', {}).get('image', '')
-
-        image_url = ''
-        if isinstance(embbed_urls, dict):
-            image_url = embbed_urls.get('identifier', '')
-        else:
-            image_url = embbed_urls
+        # Parsed articles are shared across sessions and reruns
+        article = summarize_article(url)
+        authors = article['authors']
+        publish_date = article['publish_date']
+        article_name = article['title']
+        links = article['link']
+        image_url = article['image_url']
 
         st.text(f'Authors: {", ".join(authors)}')
         st.text(f'Publish Date: {publish_date}')
-        keywords = article.keywords
+        keywords = article['keywords']
         st.text(f'Keywords: {", ".join(keywords)}')
         st.text(f'Link: {links}')
 
@@ -38,7 +31,7 @@ def article_summarizer():
                 st.image(image_url)
             else:
                 st.write("No image available.")
-            st.write(article.text)
+            st.write(article['text'])
         
         with tab2:
             st.subheader('Summary')
@@ -47,6 +40,8 @@ def article_summarizer():
                 st.image(image_url)
             else:
                 st.write("No image available.")
-            st.write(article.summary)
+            st.write(article['summary'])
+
+    developer_panel()
 
 article_summarizer()
\ No newline at end of file
@@ -1,61 +1,217 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
-import altair as alt
-import seaborn as sns
-
-@st.cache_data
-def load_data(file):
+from engine import data
+from engine.data import AGG_FUNCS, clean_data, load_data
+from utils.lazy import lazy_import
+from utils.resources import content_key, manager
+from utils.tracing import developer_panel, trace, traced
+
+# Charting stacks are only imported when the matching chart type is rendered
+plt = lazy_import("matplotlib.pyplot")
+px = lazy_import("plotly.express")
+alt = lazy_import("altair")
+sns = lazy_import("seaborn")
+
+# ----------------------------------------------------------------------------------
+# Cached computations
+#
+# Each section below is an st.fragment, so a widget inside it only reruns that
+# section; each is traced as a `section:<name>` span. The computations are
+# additionally cached by `dataset_key` (upload content hash + cleaning options)
+# instead of hashing the DataFrame, which would cost as much as the computation
+# itself on large files. Arguments starting with `_` are not hashed by Streamlit.
+# ----------------------------------------------------------------------------------
+
+def prepare_data(digest, drop_duplicates, drop_missing, file):
     """
-    Load CSV data using pandas and return a DataFrame.
+    Load and clean an upload once per combination of cleaning options.
+
+    Only the cleaned frame is kept in the shared resource manager (the raw one
+    is dropped as soon as it is cleaned), so sessions uploading the same file
+    reuse it. It must not be mutated.
     """
-    df = pd.read_csv(file, encoding='latin1')
-    return df
+    return manager.get_or_create(
+        f"dashboard:{digest}:{drop_duplicates}:{drop_missing}",
+        lambda: clean_data(load_data(file), drop_duplicates=drop_duplicates, drop_missing=drop_missing),
+    )
 
-def clean_data(df, drop_duplicates=True, drop_missing='none'):
+def get_dataset(dataset_key):
     """
-    Perform basic data cleaning on the DataFrame.
-
-    Parameters:
-    -----------
-    df : pd.DataFrame
-        The input DataFrame to clean.
-
-    drop_duplicates : bool
-        Whether to drop duplicate rows.
-
-    drop_missing : str
-        How to handle missing values:
-        - 'none': do nothing
-        - 'drop_rows': drop any rows with missing values
-        - 'fill_mean': fill missing numeric values with column mean
-        - 'fill_zero': fill missing numeric values with 0
-
-    Returns:
-    --------
-    pd.DataFrame
-        The cleaned DataFrame.
+    Return the cleaned frame for `dataset_key`.
+
+    Fragments keep their arguments for later reruns, so they get the key rather
+    than the frame; otherwise every session would keep a frame alive after the
+    manager evicted it.
     """
-    # 1. Drop duplicates
-    if drop_duplicates:
-        df = df.drop_duplicates()
-
-    # 2. Handle missing values
-    if drop_missing == 'drop_rows':
-        df = df.dropna()
-    elif drop_missing == 'fill_mean':
-        numeric_cols = df.select_dtypes(include=np.number).columns
-        for col in numeric_cols:
-            mean_val = df[col].mean()
-            df[col].fillna(mean_val, inplace=True)
-    elif drop_missing == 'fill_zero':
-        numeric_cols = df.select_dtypes(include=np.number).columns
-        for col in numeric_cols:
-            df[col].fillna(0, inplace=True)
-
-    return df
+    return prepare_data(*dataset_key, st.session_state["sidebar_csv"])
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def describe_data(dataset_key, _df):
+    return data.describe(_df)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def missing_summary(dataset_key, _df):
+    return data.missing_summary(_df)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def group_by(dataset_key, _df, group_col, agg_col, agg_func):
+    return data.group_by(_df, group_col, agg_col, agg_func)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def pivot(dataset_key, _df, index, values, aggfunc):
+    return data.pivot(_df, index, values, aggfunc)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def correlation(dataset_key, _df):
+    return data.correlation(_df)
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def export_csv(dataset_key, _df):
+    return data.export_csv(_df)
+
+# ----------------------------------------------------------------------------------
+# Sections
+# ----------------------------------------------------------------------------------
+
+@st.fragment
+@traced("section:preview")
+def preview_section(dataset_key):
+    df = get_dataset(dataset_key)
+    st.subheader("Data Preview")
+    max_preview = min(100, df.shape[0])
+    row_count = st.slider("Number of rows to preview:", 1, max_preview, 5)
+    st.write(f"**Preview of the first {row_count} rows:**")
+    st.write(df.head(row_count))
+
+    st.write("**Shape (rows, columns):**", df.shape)
+    st.write("**Data Types:**")
+    st.write(df.dtypes.astype(str))
+
+@st.fragment
+@traced("section:stats")
+def stats_section(dataset_key):
+    df = get_dataset(dataset_key)
+    st.subheader("Basic Statistics")
+    st.write(describe_data(dataset_key, df))
+
+    # ----- Missing Values Summary -----
+    st.subheader("Missing Values Summary")
+    st.dataframe(missing_summary(dataset_key, df))
+
+@st.fragment
+@traced("section:group_by")
+def group_by_section(dataset_key, categorical_cols, numeric_cols):
+    df = get_dataset(dataset_key)
+    st.subheader("Additional Insights / Group-by Analysis")
+    if categorical_cols:
+        group_col = st.selectbox(
+            "Select a categorical column to group by:", 
+            options=categorical_cols
+        )
+
+        agg_col = st.selectbox(
+            "Select a numeric column to aggregate:", 
+            options=numeric_cols
+        )
+
+        agg_func = st.selectbox("Select aggregation function:", AGG_FUNCS)
+
+        if st.button("Compute Group-by"):
+            grouped = group_by(dataset_key, df, group_col, agg_col, agg_func)
+            st.write("**Group-by Results:**")
+            st.write(grouped)
+    else:
+        st.write("No categorical columns found for group-by analysis.")
+
+@st.fragment
+@traced("section:pivot")
+def pivot_section(dataset_key, categorical_cols, numeric_cols):
+    df = get_dataset(dataset_key)
+    st.subheader("Build a Simple Pivot Table")
+    if categorical_cols and numeric_cols:
+        pivot_index = st.selectbox("Pivot Table: Select a column for rows:", categorical_cols)
+        pivot_values = st.selectbox("Pivot Table: Select a numeric column for values:", numeric_cols)
+        pivot_aggfunc = st.selectbox("Pivot Table: Aggregation function:", AGG_FUNCS)
+
+        if st.button("Generate Pivot Table"):
+            st.dataframe(pivot(dataset_key, df, pivot_index, pivot_values, pivot_aggfunc))
+    else:
+        st.write("Need at least one categorical and one numeric column to build a pivot table.")
+
+@st.fragment
+@traced("section:chart")
+def chart_section(dataset_key, categorical_cols, numeric_cols):
+    df = get_dataset(dataset_key)
+    st.subheader("Charts")
+    chart_type = st.selectbox(
+        "Select Chart Type:",
+        [
+            "area_chart",
+            "bar_chart",
+            "line_chart",
+            "scatter_chart (Altair)",
+            "pie_chart (Plotly)",
+            "histogram (Plotly)",
+            "box_plot (Plotly)",
+            "heatmap (Seaborn)"
+        ],
+        help="Choose which chart to display."
+    )
+
+    # Axis selection if needed
+    if chart_type == "scatter_chart (Altair)":
+        x_axis = st.selectbox("Select X-axis (numeric):", numeric_cols)
+        y_axis = st.selectbox("Select Y-axis (numeric):", numeric_cols)
+    elif chart_type in ["histogram (Plotly)", "box_plot (Plotly)"]:
+        x_axis = st.selectbox("Select numeric column:", numeric_cols)
+    elif chart_type == "pie_chart (Plotly)":
+        category_axis = st.selectbox("Select category column for Pie Chart:", categorical_cols)
+    else:
+        x_axis, y_axis, category_axis = None, None, None
+
+    # Render the chosen chart
+    with trace(f"chart:{chart_type.split()[0]}", items=len(df)):
+        if chart_type == "area_chart":
+            st.area_chart(df[numeric_cols])
+        elif chart_type == "bar_chart":
+            st.bar_chart(df[numeric_cols])
+        elif chart_type == "line_chart":
+            st.line_chart(df[numeric_cols])
+        elif chart_type == "scatter_chart (Altair)":
+            scatter_chart = alt.Chart(df).mark_circle().encode(
+                x=x_axis,
+                y=y_axis,
+                tooltip=df.columns.tolist()
+            ).interactive()
+            st.altair_chart(scatter_chart, use_container_width=True)
+        elif chart_type == "pie_chart (Plotly)":
+            fig = px.pie(df, names=category_axis)
+            st.plotly_chart(fig, use_container_width=True)
+        elif chart_type == "histogram (Plotly)":
+            fig = px.histogram(df, x=x_axis)
+            st.plotly_chart(fig, use_container_width=True)
+        elif chart_type == "box_plot (Plotly)":
+            fig = px.box(df, y=x_axis)
+            st.plotly_chart(fig, use_container_width=True)
+        elif chart_type == "heatmap (Seaborn)":
+            corr = correlation(dataset_key, df)
+            fig, ax = plt.subplots()
+            sns.heatmap(corr, annot=True, cmap="Blues", ax=ax)
+            st.pyplot(fig)
+
+@st.fragment
+@traced("section:export")
+def export_section(dataset_key):
+    df = get_dataset(dataset_key)
+    st.subheader("Download Cleaned Data")
+    # Serializing a large frame takes seconds, so only do it on request
+    if st.button("Prepare CSV") or st.session_state.get("export_ready") == dataset_key:
+        st.session_state["export_ready"] = dataset_key
+        st.download_button(
+            label="Download as CSV",
+            data=export_csv(dataset_key, df),
+            file_name="cleaned_data.csv",
+            mime="text/csv"
+        )
 
 def auto_dashboard():
     """
@@ -121,156 +277,27 @@ def auto_dashboard():
             "fill_mean (fill numeric columns with mean)": "fill_mean",
             "fill_zero (fill numeric columns with 0)": "fill_zero"
         }
+        drop_missing = missing_mapping[missing_option]
 
+        # Only the upload and the cleaning options above trigger a full rerun;
+        # everything below reruns per section.
         with st.spinner("Loading and cleaning data..."):
-            df = load_data(uploaded_csv)
-            df = clean_data(
-                df,
-                drop_duplicates=drop_dup,
-                drop_missing=missing_mapping[missing_option]
-            )
-
-        # ----- Data Preview -----
-        st.subheader("Data Preview")
-        max_preview = min(100, df.shape[0])
-        row_count = st.slider("Number of rows to preview:", 1, max_preview, 5)
-        st.write(f"**Preview of the first {row_count} rows:**")
-        st.write(df.head(row_count))
-
-        st.write("**Shape (rows, columns):**", df.shape)
-        st.write("**Data Types:**")
-        st.write(df.dtypes.astype(str))
-
-        st.subheader("Basic Statistics")
-        st.write(df.describe(include="all"))
-
-        # ----- Missing Values Summary -----
-        st.subheader("Missing Values Summary")
-        missing_df = df.isna().sum().reset_index()
-        missing_df.columns = ["Column", "Missing Values"]
-        st.dataframe(missing_df)
-
-        # ----- Additional Insights / Group-by Analysis -----
-        st.subheader("Additional Insights / Group-by Analysis")
-        categorical_cols = df.select_dtypes(exclude=np.number).columns.tolist()
-        numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-
-        if categorical_cols:
-            group_col = st.selectbox(
-                "Select a categorical column to group by:", 
-                options=categorical_cols
-            )
-
-            agg_col = st.selectbox(
-                "Select a numeric column to aggregate:", 
-                options=numeric_cols
-            )
-
-            agg_func = st.selectbox("Select aggregation function:", ["mean", "sum", "count", "max", "min"])
-
-            if st.button("Compute Group-by"):
-                if agg_func == "mean":
-                    grouped = df.groupby(group_col)[agg_col].mean()
-                elif agg_func == "sum":
-                    grouped = df.groupby(group_col)[agg_col].sum()
-                elif agg_func == "count":
-                    grouped = df.groupby(group_col)[agg_col].count()
-                elif agg_func == "max":
-                    grouped = df.groupby(group_col)[agg_col].max()
-                elif agg_func == "min":
-                    grouped = df.groupby(group_col)[agg_col].min()
-
-                st.write("**Group-by Results:**")
-                st.write(grouped)
-        else:
-            st.write("No categorical columns found for group-by analysis.")
-
-        # ----- Simple Pivot Table -----
-        st.subheader("Build a Simple Pivot Table")
-        if categorical_cols and numeric_cols:
-            pivot_index = st.selectbox("Pivot Table: Select a column for rows:", categorical_cols)
-            pivot_values = st.selectbox("Pivot Table: Select a numeric column for values:", numeric_cols)
-            pivot_aggfunc = st.selectbox("Pivot Table: Aggregation function:", ["mean", "sum", "count", "max", "min"])
-
-            if st.button("Generate Pivot Table"):
-                pivot_table = pd.pivot_table(
-                    df,
-                    index=pivot_index,
-                    values=pivot_values,
-                    aggfunc=pivot_aggfunc
-                )
-                st.dataframe(pivot_table)
-        else:
-            st.write("Need at least one categorical and one numeric column to build a pivot table.")
-
-        # ----- Chart Section -----
-        st.subheader("Charts")
-        chart_type = st.selectbox(
-            "Select Chart Type:",
-            [
-                "area_chart",
-                "bar_chart",
-                "line_chart",
-                "scatter_chart (Altair)",
-                "pie_chart (Plotly)",
-                "histogram (Plotly)",
-                "box_plot (Plotly)",
-                "heatmap (Seaborn)"
-            ],
-            help="Choose which chart to display."
-        )
-
-        # Axis selection if needed
-        if chart_type == "scatter_chart (Altair)":
-            x_axis = st.selectbox("Select X-axis (numeric):", numeric_cols)
-            y_axis = st.selectbox("Select Y-axis (numeric):", numeric_cols)
-        elif chart_type in ["histogram (Plotly)", "box_plot (Plotly)"]:
-            x_axis = st.selectbox("Select numeric column:", numeric_cols)
-        elif chart_type == "pie_chart (Plotly)":
-            category_axis = st.selectbox("Select category column for Pie Chart:", categorical_cols)
-        else:
-            x_axis, y_axis, category_axis = None, None, None
-
-        # Render the chosen chart
-        if chart_type == "area_chart":
-            st.area_chart(df[numeric_cols])
-        elif chart_type == "bar_chart":
-            st.bar_chart(df[numeric_cols])
-        elif chart_type == "line_chart":
-            st.line_chart(df[numeric_cols])
-        elif chart_type == "scatter_chart (Altair)":
-            scatter_chart = alt.Chart(df).mark_circle().encode(
-                x=x_axis,
-                y=y_axis,
-                tooltip=df.columns.tolist()
-            ).interactive()
-            st.altair_chart(scatter_chart, use_container_width=True)
-        elif chart_type == "pie_chart (Plotly)":
-            fig = px.pie(df, names=category_axis)
-            st.plotly_chart(fig, use_container_width=True)
-        elif chart_type == "histogram (Plotly)":
-            fig = px.histogram(df, x=x_axis)
-            st.plotly_chart(fig, use_container_width=True)
-        elif chart_type == "box_plot (Plotly)":
-            fig = px.box(df, y=x_axis)
-            st.plotly_chart(fig, use_container_width=True)
-        elif chart_type == "heatmap (Seaborn)":
-            corr = df.corr(numeric_only=True)
-            fig, ax = plt.subplots()
-            sns.heatmap(corr, annot=True, cmap="Blues", ax=ax)
-            st.pyplot(fig)
-
-        # ----- Download Options -----
-        st.subheader("Download Cleaned Data")
-        csv_data = df.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            label="Download as CSV",
-            data=csv_data,
-            file_name="cleaned_data.csv",
-            mime="text/csv"
-        )
+            digest = content_key(uploaded_csv)
+            df = prepare_data(digest, drop_dup, drop_missing, uploaded_csv)
+        dataset_key = (digest, drop_dup, drop_missing)
+
+        categorical_cols, numeric_cols = data.column_types(df)
+
+        preview_section(dataset_key)
+        stats_section(dataset_key)
+        group_by_section(dataset_key, categorical_cols, numeric_cols)
+        pivot_section(dataset_key, categorical_cols, numeric_cols)
+        chart_section(dataset_key, categorical_cols, numeric_cols)
+        export_section(dataset_key)
     else:
         st.info("Please upload a CSV file to get started.")
 
+    developer_panel()
+
 if __name__ == "__main__":
     auto_dashboard()
@@ -1,8 +1,33 @@
 import streamlit as st
-import pandas as pd
-import textblob
-import cleantext
-from transformers import pipeline
+from engine import sentiment
+from engine.data import load_data
+from utils.resources import content_key, manager
+from utils.tracing import developer_panel, trace
+
+def read_shared_csv(upload):
+    """
+    Parse an uploaded CSV once per distinct content. The frame is shared, so copy before mutating.
+    """
+    return manager.get_or_create(
+        f"sentiment:csv:{content_key(upload)}",
+        lambda: load_data(upload),
+    )
+
+# The scored columns are cached by upload content hash, column and labels, so
+# reruns from the slider or the column picker do not score the file again.
+# Arguments starting with `_` are not hashed by Streamlit.
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def score_column(digest, column, _df):
+    return sentiment.score_batch(_df[column].tolist())
+
+@st.cache_data(max_entries=8, show_spinner="Classifying all rows...")
+def classify_column(digest, column, labels, _df):
+    return sentiment.classify_batch(_df[column].tolist(), list(labels))
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def convert_df_for_download(result_key, _df):
+    return _df.to_csv(index=False).encode("utf-8")
 
 def sentiment_analyzer():
     """
@@ -34,25 +59,16 @@ def sentiment_analyzer():
             text = st.text_input(" ", placeholder="Enter the text here:")
             
             if text:
-                blob = textblob.TextBlob(text)
-                st.write("Polarity:", round(blob.sentiment.polarity, 2))
-                st.write("Subjectivity:", round(blob.sentiment.subjectivity, 2))
+                polarity, subjectivity = sentiment.textblob_sentiment(text)
+                st.write("Polarity:", polarity)
+                st.write("Subjectivity:", subjectivity)
             
             # ----------------------------------------------------------------------------------
             # (B) Clean Text
             # ----------------------------------------------------------------------------------
             pre = st.text_input("Clean text", placeholder="Enter text here:")
             if (pre or text) and st.button("Clean"):
-                cleaned = cleantext.clean_words(
-                    pre, 
-                    clean_all=False, 
-                    lowercase=True, 
-                    stopwords=True, 
-                    extra_spaces=True,
-                    numbers=True,
-                    punct=True,
-                    stp_lang="english"
-                )
+                cleaned = sentiment.clean_text(pre)
                 st.text(f"Cleaned text: {cleaned}")
             else:
                 pass
@@ -62,35 +78,26 @@ def sentiment_analyzer():
         # ----------------------------------------------------------------------------------
         with st.expander("Analyze your CSV"):
             upload = st.file_uploader("Upload your CSV file here", type="csv", key="simple-file-uploader")
-            
-            @st.cache_data
-            def score(x):
-                blob1 = textblob.TextBlob(x)
-                return round(blob1.sentiment.polarity, 2)
-            
-            def analyze(x):
-                if x >= 0.5:
-                    return "Positive"
-                elif x <= -0.5:
-                    return "Negative"
-                else:
-                    return "Neutral"
                 
             if upload:
-                df = pd.read_csv(upload, encoding="latin1")
+                digest = content_key(upload)
+                df = read_shared_csv(upload)
                 st.write("**Original Data Sample**:", df.head())
                 
                 # Let user drop columns
                 data_to_delete = st.multiselect("Select columns to delete:", df.columns)
-                df.drop(columns=data_to_delete, inplace=True)
+                # drop() returns a copy, leaving the shared frame untouched
+                df = df.drop(columns=data_to_delete)
                 
                 # Choose which column to analyze for sentiment
                 tex_to_analyze = st.text_input("Enter the column name to analyze:", value="text")
                 
                 # Apply TextBlob sentiment
                 if tex_to_analyze in df.columns:
-                    df["Sentiment Score"] = df[tex_to_analyze].apply(score)
-                    df["Analysis"] = df["Sentiment Score"].apply(analyze)
+                    with trace("textblob_csv", items=len(df)):
+                        results = score_column(digest, tex_to_analyze, df)
+                        df["Sentiment Score"] = [polarity for polarity, _ in results]
+                        df["Analysis"] = [label for _, label in results]
                     
                     value_to_display = st.slider(
                         "Select the number of rows to display:", 
@@ -98,11 +105,8 @@ def sentiment_analyzer():
                     )
                     st.write(df.head(value_to_display))
                     
-                    @st.cache_data
-                    def convert_df_for_download(dataframe):
-                        return dataframe.to_csv(index=False).encode("utf-8")
-                    
-                    csv_data = convert_df_for_download(df)
+                    result_key = ("textblob", digest, tex_to_analyze, tuple(data_to_delete))
+                    csv_data = convert_df_for_download(result_key, df)
                     st.download_button(
                         label="Download CSV", 
                         data=csv_data, 
@@ -134,26 +138,15 @@ def sentiment_analyzer():
         # Candidate classes — customize as needed
         candidate_labels = ["positive", "negative", "neutral"]
         
-        # Initialize the zero-shot classifier
-        # (We do this outside any function so we only load once)
-        zero_shot_classifier = pipeline(
-            "zero-shot-classification", 
-            model="facebook/bart-large-mnli"
-        )
-        
-        # Function to classify text using Zero-Shot Classification
-        def classify_text(text):
-            result = zero_shot_classifier(text, candidate_labels, multi_label=False)
-            # result example:
-            # {
-            #   'sequence': "the original text",
-            #   'labels': ['positive', 'neutral', 'negative'],  # sorted by score
-            #   'scores': [0.8, 0.15, 0.05]
-            # }
-            return result["labels"][0]
+        # The model is only loaded the first time something is classified
+        def load_model():
+            with st.spinner("Loading the zero-shot model..."):
+                sentiment.load_zero_shot_classifier()
 
         if st.button("Classify"):
-            prediction = classify_text(user_input)
+            load_model()
+            with trace("classify_text", items=1):
+                prediction = sentiment.classify_text(user_input, candidate_labels)
             st.write(f"Predicted label: **{prediction}**")
 
         # -------------------------------------------------------------------------
@@ -165,12 +158,13 @@ def sentiment_analyzer():
         csv_upload = st.file_uploader("Upload your CSV file here", type="csv", key="advanced-file-uploader")
         
         if csv_upload is not None:
-            df_zs = pd.read_csv(csv_upload, encoding="latin1")
+            digest_zs = content_key(csv_upload)
+            df_zs = read_shared_csv(csv_upload)
             st.write("**Original Data Sample**:", df_zs.head())
 
             # Let user remove unnecessary columns
             cols_to_drop_zs = st.multiselect("Select columns to delete:", df_zs.columns)
-            df_zs.drop(columns=cols_to_drop_zs, inplace=True)
+            df_zs = df_zs.drop(columns=cols_to_drop_zs)
             
             # Choose which column to analyze
             text_column_zs = st.text_input(
@@ -179,9 +173,12 @@ def sentiment_analyzer():
             )
             
             if text_column_zs in df_zs.columns:
-                # Apply zero-shot classification on the entire column
-                with st.spinner("Classifying all rows..."):
-                    df_zs["Predicted_Sentiment"] = df_zs[text_column_zs].apply(classify_text)
+                # Apply zero-shot classification on the entire column, in model batches
+                # (the model is loaded on the first miss)
+                with trace("classify_csv", items=len(df_zs)):
+                    df_zs["Predicted_Sentiment"] = classify_column(
+                        digest_zs, text_column_zs, tuple(candidate_labels), df_zs
+                    )
                 
                 st.write("**Classification Results**:")
                 row_count_zs = st.slider(
@@ -191,11 +188,8 @@ def sentiment_analyzer():
                 st.write(df_zs.head(row_count_zs))
                 
                 # Option to download the results
-                @st.cache_data
-                def convert_zs_df_for_download(dataframe):
-                    return dataframe.to_csv(index=False).encode("utf-8")
-                
-                zs_csv = convert_zs_df_for_download(df_zs)
+                result_key = ("zero-shot", digest_zs, text_column_zs, tuple(cols_to_drop_zs))
+                zs_csv = convert_df_for_download(result_key, df_zs)
                 st.download_button(
                     label="Download CSV (Zero-Shot Results)", 
                     data=zs_csv, 
@@ -207,5 +201,8 @@ def sentiment_analyzer():
                     f"The column '{text_column_zs}' does not exist in your CSV. "
                     "Please check the column name."
                 )
+
+    developer_panel()
+
 if __name__ == '__main__':
     sentiment_analyzer()
\ No newline at end of file
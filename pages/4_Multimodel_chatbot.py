@@ -1,18 +1,30 @@
 import streamlit as st
-from huggingface_hub import InferenceClient
 from dotenv import load_dotenv
 import os
 from PIL import Image
 import io
 import random
-import time
-import PyPDF2
-import tempfile
+from utils.images import add_to_gallery, image_content_part, prepare_upload, show_gallery
+from utils.lazy import lazy_import
+from utils.resources import content_key, manager
+from utils.tracing import developer_panel, trace
+
+huggingface_hub = lazy_import("huggingface_hub")
+PyPDF2 = lazy_import("PyPDF2")
 
 # Load environment variables
 load_dotenv()
 HF_API = os.environ.get("HF_API_KEY")
-client = InferenceClient(api_key=HF_API)
+# Optional endpoint override, e.g. a local server or the load-test mock
+HF_BASE_URL = os.environ.get("HF_BASE_URL")
+
+
+@st.cache_resource
+def get_client():
+    """
+    Build the inference client on first use and share it across sessions.
+    """
+    return huggingface_hub.InferenceClient(api_key=HF_API, base_url=HF_BASE_URL)
 
 # Set up Streamlit page
 st.set_page_config(page_title="AI Chat Assistant", page_icon="🤖")
@@ -128,25 +140,19 @@ def get_random_loading_text():
     return random.choice(funny_texts)
 
 # Function to extract text from PDF
+# (extracted once per distinct PDF and shared across sessions)
 def extract_text_from_pdf(file):
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        tmp_file.write(file.read())
-        tmp_file_path = tmp_file.name
-    reader = PyPDF2.PdfReader(tmp_file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    os.unlink(tmp_file_path)
-    return text
+    def extract():
+        reader = PyPDF2.PdfReader(io.BytesIO(file.getvalue()))
+        return "\n".join(page.extract_text() for page in reader.pages) + "\n"
+
+    return manager.get_or_create(f"pdf:{content_key(file)}", extract)
 
 # Handle Text Models
 def handle_text_model(user_input):
     if upload_file:
         if upload_file.type.startswith("image"):
-            image = Image.open(upload_file)
-            buffered = io.BytesIO()
-            image.save(buffered, format="PNG")
-            img_str = buffered.getvalue()
+            # Text models cannot see the image, so there is no need to decode it
             user_input += f" [Image Uploaded: {upload_file.name}]"
         elif upload_file.type == "application/pdf":
             text = extract_text_from_pdf(upload_file)
@@ -157,12 +163,14 @@ def handle_text_model(user_input):
 
     st.session_state.messages.append({"role": "user", "content": user_input})
 
-    completion = client.chat.completions.create(
-        model=selected_model,
-        messages=st.session_state.messages,
-        max_tokens=2800,
-        temperature=0.7,
-    )
+    with trace("chat_completion") as span:
+        completion = get_client().chat.completions.create(
+            model=selected_model,
+            messages=st.session_state.messages,
+            max_tokens=2800,
+            temperature=0.7,
+        )
+        span.items = completion.usage.completion_tokens if completion.usage else None
 
     assistant_response = completion.choices[0].message.content
     st.session_state.messages.append({"role": "assistant", "content": assistant_response})
@@ -171,14 +179,13 @@ def handle_text_model(user_input):
 def handle_image_model(user_input):
     loading_text = get_random_loading_text()
     with st.spinner(loading_text):
-        time.sleep(1)
         try:
-            image = client.text_to_image(user_input)
+            with trace("text_to_image", items=1):
+                image = get_client().text_to_image(user_input)
             if isinstance(image, Image.Image):
-                img_buffer = io.BytesIO()
-                image.save(img_buffer, format="PNG")
-                img_buffer.seek(0)
-                st.image(img_buffer, caption="Generated Image", use_column_width=True)
+                # st.image accepts the PIL image directly, no PNG round-trip needed
+                st.image(image, caption="Generated Image", use_column_width=True)
+                add_to_gallery(image, user_input)
             else:
                 st.error("The model did not return an image.")
         except Exception as e:
@@ -188,34 +195,37 @@ def handle_image_model(user_input):
 def handle_vision_text_model(user_input):
     loading_text = get_random_loading_text()
     with st.spinner(loading_text):
-        time.sleep(1)
         try:
+            image_part = None
             if upload_file:
                 if upload_file.type.startswith("image"):
-                    image = Image.open(upload_file)
-                    buffered = io.BytesIO()
-                    image.save(buffered, format="PNG")
-                    img_str = buffered.getvalue()
-                    user_input += f" [Image Uploaded: {upload_file.name}]"
+                    # Downscaled and compressed once per distinct upload, then cached
+                    image_bytes, mime_type = prepare_upload(upload_file)
+                    image_part = image_content_part(image_bytes, mime_type)
                 elif upload_file.type == "application/pdf":
                     text = extract_text_from_pdf(upload_file)
                     user_input += f" [PDF Content: {text[:500]}...]"  # Limiting text length
                 else:
-                    content = upload_file.read().decode()
-                    user_input += f" [File Content: {content[:500]}...]"  # Limiting text length
+                    file_content = upload_file.read().decode()
+                    user_input += f" [File Content: {file_content[:500]}...]"  # Limiting text length
+
+            content = user_input
+            if image_part:
+                content = [{"type": "text", "text": user_input}, image_part]
 
             messages = [
                 {
                     "role": "user",
-                    "content": user_input
+                    "content": content
                 }
             ]
-            completion = client.chat.completions.create(
-                model=selected_model,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7,
-            )
+            with trace("vision_completion", items=1):
+                completion = get_client().chat.completions.create(
+                    model=selected_model,
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.7,
+                )
             assistant_response = completion.choices[0].message.content
             st.write(f"**Assistant:** {assistant_response}")
         except Exception as e:
@@ -246,3 +256,8 @@ elif selected_model in available_models["Vision & Text Models"]:
             continue
         if message["role"] == "assistant":
             st.write(f"**Assistant:** {message['content']}")
+
+elif selected_model in available_models["Image Models"]:
+    show_gallery()
+
+developer_panel()
@@ -0,0 +1,155 @@
+"""
+Measure per-interaction latency of the Auto Dashboard on a large CSV.
+
+The app is started with ``streamlit run`` and driven over its websocket like a
+browser (see ``st_client.py``), so widgets inside a fragment only rerun that
+fragment. Each step reports the latency seen by the client and, when the
+checkout has tracing, the server-side spans recorded during the step (e.g.
+``section:group_by``).
+
+To compare before and after a change, point ``--app`` at a checkout of the
+older commit:
+    git worktree add /tmp/before <commit>
+    python scripts/bench_dashboard.py --app /tmp/before
+    python scripts/bench_dashboard.py
+
+Usage:
+    python scripts/bench_dashboard.py [--rows 1000000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+from st_client import AppSession, StreamlitServer
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGE = "Auto_dashboard"
+
+
+def make_csv(path, rows, seed=0):
+    """
+    Write a CSV with numeric, categorical and missing values.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "category": rng.choice([f"cat_{i}" for i in range(20)], rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "price": rng.normal(100, 15, rows).round(2),
+        "quantity": rng.integers(1, 50, rows),
+        "rating": rng.uniform(0, 5, rows).round(1),
+    })
+    df.loc[rng.random(rows) < 0.01, "price"] = np.nan
+    df.to_csv(path, index=False)
+
+
+# (step name, label prefix, values cycled through on each repeat; None clicks a button)
+INTERACTIONS = [
+    ("preview slider", "Number of rows to preview", [20, 50, 80, 35, 65]),
+    ("chart type", "Select Chart Type", ["histogram (Plotly)", "box_plot (Plotly)"]),
+    ("group-by function", "Select aggregation function", ["sum", "count", "max", "min", "mean"]),
+    ("group-by compute", "Compute Group-by", None),
+    ("cleaning option", "Handle Missing Values", [
+        "fill_zero (fill numeric columns with 0)",
+        "fill_mean (fill numeric columns with mean)",
+        "drop_rows (remove rows with missing values)",
+        "none (leave missing values as is)",
+    ]),
+]
+
+
+class SpanReader:
+    """
+    Return the spans appended to the trace file since the last call.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._offset = 0
+
+    def new_spans(self):
+        if not self.path.exists():
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            f.seek(self._offset)
+            lines = f.readlines()
+            self._offset = f.tell()
+        totals = {}
+        for line in lines:
+            record = json.loads(line)
+            totals[record["span"]] = totals.get(record["span"], 0.0) + record["wall_s"]
+        return totals
+
+
+async def run(url, data, repeat, timeout, spans):
+    results = {}
+
+    def record(step, rerun, latency):
+        entry = results.setdefault(step, {"rerun": rerun, "latency": [], "spans": []})
+        entry["latency"].append(latency)
+        entry["spans"].append(spans.new_spans())
+
+    async with AppSession(url, page=PAGE, timeout=timeout) as app:
+        await app.run()
+        spans.new_spans()
+        record("upload csv", "full", await app.upload("Upload a CSV", "bench.csv", data))
+
+        for i in range(repeat):
+            for step, label, values in INTERACTIONS:
+                rerun = "fragment" if app.widget(label).fragment_id else "full"
+                if values is None:
+                    latency = await app.click(label)
+                else:
+                    latency = await app.set(label, values[i % len(values)])
+                record(step, rerun, latency)
+    return results
+
+
+def _span_medians(span_runs, top=3):
+    names = {name for spans in span_runs for name in spans}
+    medians = {name: statistics.median(spans.get(name, 0.0) for spans in span_runs) for name in names}
+    ranked = sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]
+    return ", ".join(f"{name} {seconds:.3f}s" for name, seconds in ranked if seconds > 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", type=Path, default=ROOT, help="checkout to benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds per rerun")
+    parser.add_argument("--csv", type=Path, help="reuse an existing CSV instead of generating one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = Path(tmp) / f"bench_{args.rows}.csv"
+            print(f"Generating {args.rows:,} rows...", file=sys.stderr)
+            make_csv(csv_path, args.rows)
+
+        trace_file = Path(tmp) / "traces.jsonl"
+        env = {"APP_TRACING": "1", "APP_TRACE_FILE": str(trace_file), "APP_TRACE_PROM": ""}
+        with StreamlitServer(args.app / "Home.py", env=env) as server:
+            results = asyncio.run(
+                run(server.url, csv_path.read_bytes(), args.repeat, args.timeout, SpanReader(trace_file))
+            )
+
+    print(f"app: {args.app}")
+    print(f"{'step':<20}{'rerun':<10}{'median':>9}{'max':>9}  top spans (median)")
+    for step, entry in results.items():
+        latency = entry["latency"]
+        print(
+            f"{step:<20}{entry['rerun']:<10}{statistics.median(latency):>8.3f}s{max(latency):>8.3f}s"
+            f"  {_span_medians(entry['spans'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+"""
+Simulate many concurrent users against a running Streamlit server.
+
+The harness starts ``streamlit run Home.py`` and every virtual user drives it
+over its own websocket connection, like a browser tab (see ``st_client.py``).
+Each flow is a fresh session, so the server sees as many concurrent sessions
+as there are users, and the resource manager, caches and memory pressure
+behave as in production. Chat flows talk to a local mock of the
+chat-completions API (via ``HF_BASE_URL``), so no tokens are spent and the
+latency is controlled.
+
+The report gives latency percentiles and the failure rate for every step,
+plus the RSS and CPU of the server process sampled over time. With the same
+arguments it is stable enough to diff across commits:
+    python scripts/loadtest.py --users 20 --iterations 3 -o before.json
+    python scripts/loadtest.py --users 20 --iterations 3 -o after.json --compare before.json
+
+Usage:
+    python scripts/loadtest.py [--users 10] [--iterations 2] [--pages dashboard,sentiment,chatbot]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from bench_dashboard import make_csv
+from st_client import AppSession, StreamlitServer
+
+try:
+    import psutil
+except ImportError:  # optional, /proc is read instead
+    psutil = None
+
+# Raised while sampling once the server has exited
+_SAMPLE_ERRORS = (OSError, ValueError) + ((psutil.Error,) if psutil is not None else ())
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = {
+    "dashboard": "Auto_dashboard",
+    "sentiment": "Sentiment_analyzer",
+    "chatbot": "Multimodel_chatbot",
+}
+PERCENTILES = [50, 90, 95, 99]
+
+
+# ----------------------------------------------------------------------------------
+# Test fixtures
+# ----------------------------------------------------------------------------------
+
+REVIEW_WORDS = [
+    "great", "terrible", "okay", "love", "hate", "fine", "amazing", "awful",
+    "product", "service", "delivery", "quality", "price", "support",
+]
+
+
+def make_reviews_csv(path, rows, seed=0):
+    """
+    Write a CSV with a ``text`` column of short pseudo reviews.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    texts = [" ".join(rng.choice(REVIEW_WORDS, 8)) for _ in range(rows)]
+    pd.DataFrame({"id": range(rows), "text": texts}).to_csv(path, index=False)
+
+
+class MockInferenceHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for the chat-completions endpoint of the inference API.
+    """
+    latency = 0.2
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        time.sleep(self.latency)
+        body = json.dumps({
+            "id": "mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "mock",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "This is a mock reply."},
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(latency):
+    MockInferenceHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockInferenceHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ----------------------------------------------------------------------------------
+# Flows
+#
+# A flow is a list of (step name, action). An action gets the session, performs
+# one interaction and returns its latency in seconds.
+# ----------------------------------------------------------------------------------
+
+def dashboard_flow(fixtures):
+    return [
+        ("open", lambda app: app.run()),
+        ("upload csv", lambda app: app.upload("sidebar_csv", "data.csv", fixtures["data_csv"])),
+        ("preview slider", lambda app: app.set("Number of rows to preview", 20)),
+        ("chart type", lambda app: app.set("Select Chart Type", "histogram (Plotly)")),
+        ("group-by", lambda app: app.click("Compute Group-by")),
+        ("cleaning option", lambda app: app.set(
+            "Handle Missing Values", "fill_zero (fill numeric columns with 0)"
+        )),
+    ]
+
+
+def sentiment_flow(fixtures):
+    async def upload(app):
+        latency = await app.upload("simple-file-uploader", "reviews.csv", fixtures["reviews_csv"])
+        if fixtures["zero_shot"]:
+            latency += await app.upload("advanced-file-uploader", "reviews.csv", fixtures["reviews_csv"])
+        return latency
+
+    return [
+        ("open", lambda app: app.run()),
+        ("classify csv", upload),
+        ("rows slider", lambda app: app.set("Select the number of rows", 20)),
+    ]
+
+
+def chatbot_flow(fixtures):
+    def ask(question):
+        return lambda app: app.set("What's your question?", question)
+
+    return [
+        ("open", lambda app: app.run()),
+        ("chat 1", ask("Hello, who are you?")),
+        ("chat 2", ask("Write a haiku about caching.")),
+        ("chat 3", ask("Summarize our conversation.")),
+    ]
+
+
+FLOWS = {
+    "dashboard": dashboard_flow,
+    "sentiment": sentiment_flow,
+    "chatbot": chatbot_flow,
+}
+
+
+async def run_flow(url, page, flow, timeout, record):
+    """
+    Run one new session through ``flow``, reporting each step via ``record``.
+
+    The remaining steps of a flow are skipped after the first failure.
+    """
+    try:
+        app = AppSession(url, page=PAGES[page], timeout=timeout)
+        await app.connect()
+    except Exception as e:
+        record(page, flow[0][0], 0.0, f"{type(e).__name__}: {e}")
+        return
+    try:
+        for step, action in flow:
+            error = None
+            start = time.perf_counter()
+            try:
+                latency = await action(app)
+            except Exception as e:
+                latency = time.perf_counter() - start
+                error = f"{type(e).__name__}: {e}"
+            record(page, step, latency, error)
+            if error:
+                return
+    finally:
+        await app.close()
+
+
+# ----------------------------------------------------------------------------------
+# Measurements
+# ----------------------------------------------------------------------------------
+
+class ResourceSampler(threading.Thread):
+    """
+    Sample RSS and CPU utilisation of process ``pid`` at a fixed interval.
+    """
+
+    def __init__(self, pid, interval):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._process = psutil.Process(pid) if psutil is not None else None
+
+    def _read(self):
+        """
+        Return (RSS in MiB, CPU seconds used so far).
+        """
+        if self._process is not None:
+            cpu = self._process.cpu_times()
+            return self._process.memory_info().rss / 2**20, cpu.user + cpu.system
+        with open(f"/proc/{self.pid}/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Fields after the command name, which may contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        return rss, (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def run(self):
+        start = last_wall = time.perf_counter()
+        _, last_cpu = self._read()
+        while not self._stop_event.wait(self.interval):
+            try:
+                rss, cpu = self._read()
+            except _SAMPLE_ERRORS:
+                break
+            wall = time.perf_counter()
+            self.samples.append({
+                "t_s": round(wall - start, 2),
+                "rss_mb": round(rss, 1),
+                # 100% == one fully busy core
+                "cpu_percent": round(100 * (cpu - last_cpu) / (wall - last_wall), 1),
+            })
+            last_wall, last_cpu = wall, cpu
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile; deterministic for a given set of values.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(results, samples):
+    steps = {}
+    for (page, step), runs in results.items():
+        latencies = sorted(latency for latency, error in runs if error is None)
+        failures = [error for _, error in runs if error is not None]
+        steps[f"{page}/{step}"] = {
+            "count": len(runs),
+            "failures": len(failures),
+            "failure_rate": round(len(failures) / len(runs), 4),
+            "latency_s": {f"p{p}": _round(percentile(latencies, p)) for p in PERCENTILES},
+            "errors": sorted(set(failures))[:5],
+        }
+
+    rss = [s["rss_mb"] for s in samples] or [0]
+    cpu = [s["cpu_percent"] for s in samples] or [0]
+    return {
+        "steps": steps,
+        "resources": {
+            "rss_mb": {"start": rss[0], "peak": max(rss), "end": rss[-1]},
+            "cpu_percent": {"mean": round(sum(cpu) / len(cpu), 1), "max": max(cpu)},
+        },
+        "timeseries": samples,
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 4)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# ----------------------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------------------
+
+def print_report(report, baseline=None):
+    base_steps = baseline["steps"] if baseline else {}
+    header = f"{'step':<32}{'n':>5}{'fail%':>7}" + "".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+    if baseline:
+        header += f"{'p95 vs base':>14}"
+    print(header)
+    for name, step in report["steps"].items():
+        line = f"{name:<32}{step['count']:>5}{100 * step['failure_rate']:>6.1f}%"
+        for p in PERCENTILES:
+            value = step["latency_s"][f"p{p}"]
+            line += f"{value:>8.3f}s" if value is not None else f"{'-':>9}"
+        base = base_steps.get(name, {}).get("latency_s", {}).get("p95")
+        current = step["latency_s"]["p95"]
+        if baseline and base and current is not None:
+            line += f"{100 * (current - base) / base:>+13.1f}%"
+        print(line)
+
+    resources = report["resources"]
+    print(
+        f"\nServer RSS: {resources['rss_mb']['start']:.0f} -> peak {resources['rss_mb']['peak']:.0f} "
+        f"-> {resources['rss_mb']['end']:.0f} MiB; "
+        f"CPU: mean {resources['cpu_percent']['mean']:.0f}%, max {resources['cpu_percent']['max']:.0f}%"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=2, help="flows per user and page")
+    parser.add_argument("--pages", default="dashboard,sentiment,chatbot")
+    parser.add_argument("--rows", type=int, default=50_000, help="rows of the dashboard CSV")
+    parser.add_argument("--review-rows", type=int, default=2_000, help="rows of the sentiment CSV")
+    parser.add_argument("--zero-shot", action="store_true", help="also classify with the zero-shot model")
+    parser.add_argument("--mock-latency", type=float, default=0.2, help="seconds per mock completion")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which users start")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds per rerun")
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--server-log", type=Path, help="append the streamlit server output here")
+    parser.add_argument("-o", "--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="earlier JSON report to compare p95 against")
+    args = parser.parse_args()
+
+    pages = [page.strip() for page in args.pages.split(",") if page.strip()]
+    unknown = set(pages) - set(FLOWS)
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(sorted(unknown))}")
+
+    mock = start_mock_server(args.mock_latency)
+    env = {
+        "HF_BASE_URL": f"http://127.0.0.1:{mock.server_port}",
+        "HF_API_KEY": os.environ.get("HF_API_KEY", "loadtest"),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_csv, reviews_csv = Path(tmp) / "data.csv", Path(tmp) / "reviews.csv"
+        make_csv(data_csv, args.rows)
+        make_reviews_csv(reviews_csv, args.review_rows)
+        fixtures = {
+            "data_csv": data_csv.read_bytes(),
+            "reviews_csv": reviews_csv.read_bytes(),
+            "zero_shot": args.zero_shot,
+        }
+
+    results = {}
+
+    def record(page, step, latency, error):
+        results.setdefault((page, step), []).append((latency, error))
+
+    async def user(url, index):
+        if args.ramp and args.users > 1:
+            await asyncio.sleep(args.ramp * index / (args.users - 1))
+        for _ in range(args.iterations):
+            for page in pages:
+                await run_flow(url, page, FLOWS[page](fixtures), args.timeout, record)
+
+    async def run_users(url):
+        await asyncio.gather(*(user(url, index) for index in range(args.users)))
+
+    with StreamlitServer(ROOT / "Home.py", env=env, log=args.server_log) as server:
+        sampler = ResourceSampler(server.pid, args.sample_interval)
+        sampler.start()
+        started = time.perf_counter()
+        asyncio.run(run_users(server.url))
+        duration = time.perf_counter() - started
+        sampler.stop()
+    mock.shutdown()
+
+    # Order steps as they appear in the flows so reports line up across runs
+    order = {(page, step): i for i, (page, step) in enumerate(
+        (page, step) for page in pages for step, _ in FLOWS[page](fixtures)
+    )}
+    results = dict(sorted(results.items(), key=lambda item: order.get(item[0], len(order))))
+
+    report = {
+        "revision": git_revision(),
+        "config": {
+            "users": args.users,
+            "iterations": args.iterations,
+            "pages": pages,
+            "rows": args.rows,
+            "review_rows": args.review_rows,
+            "zero_shot": args.zero_shot,
+            "mock_latency_s": args.mock_latency,
+            "ramp_s": args.ramp,
+        },
+        "duration_s": round(duration, 2),
+        **summarize(results, sampler.samples),
+    }
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(report, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    failed = sum(step["failures"] for step in report["steps"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Report the cold-start import cost of Home.py and every page.
+
+Each script's top-level imports are replayed in a fresh interpreter with
+``python -X importtime`` so that nothing is shared between measurements.
+
+Usage:
+    python scripts/profile_imports.py [--top 5] [--repeat 3]
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = [ROOT / "Home.py", *sorted((ROOT / "pages").glob("*.py"))]
+
+
+def top_level_imports(path):
+    """
+    Return the source of the module-level import statements of ``path``.
+    """
+    source = path.read_text(encoding="utf-8-sig")
+    tree = ast.parse(source)
+    statements = [
+        ast.get_source_segment(source, node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    return "\n".join(statements)
+
+
+def measure(snippet):
+    """
+    Run ``snippet`` in a clean interpreter and return (total_us, [(us, module)]).
+
+    Only the top-level entries of the importtime tree are returned, so the
+    cumulative values add up to the total without double counting.
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent
+        if not name.startswith("  "):
+            entries.append((int(cumulative), name.strip()))
+    return sum(us for us, _ in entries), entries
+
+
+def interpreter_startup_modules():
+    """
+    Return the modules an empty interpreter already imports at startup.
+    """
+    _, entries = measure("pass")
+    return {module for _, module in entries}
+
+
+def profile(path, repeat, startup):
+    snippet = top_level_imports(path)
+    runs = []
+    for _ in range(repeat):
+        _, entries = measure(snippet)
+        entries = [(us, module) for us, module in entries if module not in startup]
+        runs.append((sum(us for us, _ in entries), entries))
+    # Keep the module breakdown of the median run
+    runs.sort(key=lambda run: run[0])
+    median_run = runs[len(runs) // 2]
+    return statistics.median(total for total, _ in runs), median_run[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to list per page")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per page (median is reported)")
+    args = parser.parse_args()
+
+    startup = interpreter_startup_modules()
+    failed = False
+    for path in SCRIPTS:
+        name = path.relative_to(ROOT)
+        try:
+            total, entries = profile(path, args.repeat, startup)
+        except RuntimeError as e:
+            print(f"{name}: import failed ({e})")
+            failed = True
+            continue
+
+        print(f"{name}: {total / 1e6:.3f}s")
+        for us, module in sorted(entries, reverse=True)[:args.top]:
+            print(f"    {us / 1e6:8.3f}s  {module}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
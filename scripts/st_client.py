@@ -0,0 +1,361 @@
+"""
+Drive a running Streamlit server headlessly over its websocket protocol.
+
+The client speaks the same protocol as the browser frontend: it connects to
+``/_stcore/stream``, sends widget changes as ``rerun_script`` back messages
+(with the fragment id when the widget lives in an ``st.fragment``, so only that
+fragment reruns) and uploads files through the upload endpoint. Every
+interaction is timed from sending the change until the server reports that the
+run finished, which is the latency a user waits for.
+
+``StreamlitServer`` starts ``streamlit run`` in a subprocess, so benchmarks
+and load tests measure the real server process.
+
+Usage:
+    with StreamlitServer(ROOT / "Home.py") as server:
+        async with AppSession(server.url, page="Auto_dashboard") as app:
+            await app.run()
+            await app.upload("Upload a CSV", "data.csv", data)
+            await app.set("Number of rows to preview", 20)
+            await app.click("Compute Group-by")
+"""
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.websocket import websocket_connect
+
+# Large charts are sent as single messages
+MAX_MESSAGE_SIZE = 1024 * 2**20
+
+_FINISHED = {
+    ForwardMsg.FINISHED_SUCCESSFULLY,
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+    ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+}
+
+
+class AppError(Exception):
+    """
+    Raised when a run ends with an exception shown in the app.
+    """
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StreamlitServer:
+    """
+    ``streamlit run <script>`` in a subprocess on a free local port.
+
+    ``env`` is added to the current environment. Server output goes to ``log``
+    (a path), or is discarded.
+    """
+
+    def __init__(self, script, env=None, log=None, port=None):
+        self.script = Path(script)
+        self.env = env or {}
+        self.log = log
+        self.port = port or _free_port()
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def start(self, timeout=60):
+        command = [
+            sys.executable, "-m", "streamlit", "run", str(self.script),
+            "--server.headless", "true",
+            "--server.port", str(self.port),
+            "--server.address", "127.0.0.1",
+            "--server.fileWatcherType", "none",
+            "--server.enableXsrfProtection", "false",
+            "--browser.gatherUsageStats", "false",
+        ]
+        output = open(self.log, "ab") if self.log else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            command,
+            cwd=self.script.parent,
+            env={**os.environ, **self.env},
+            stdout=output,
+            stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"streamlit exited with code {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f"{self.url}/_stcore/health", timeout=1):
+                    return self
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise TimeoutError(f"streamlit did not become healthy within {timeout}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+@dataclass
+class Widget:
+    kind: str
+    id: str
+    label: str
+    fragment_id: str
+    proto: object
+
+
+class AppSession:
+    """
+    One browser-like session of the app at ``url``.
+
+    ``page`` is the page name as shown in the URL, e.g. ``"Auto_dashboard"``;
+    empty for the main page. Widgets are looked up by their ``key``, or by the
+    start of their label (placeholder for ``st.chat_input``).
+    """
+
+    def __init__(self, url, page="", timeout=300):
+        self.url = url.rstrip("/")
+        self.page = page
+        self.timeout = timeout
+        self.session_id = None
+        self.widgets = {}
+        self._ws = None
+        self._reader = None
+        self._refs = {}
+        self._errors = []
+        self._finished = None
+        self._file_urls = {}
+        self._request_ids = itertools.count(1)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def connect(self):
+        ws_url = "ws" + self.url[len("http"):] + "/_stcore/stream"
+        self._ws = await websocket_connect(
+            ws_url, subprotocols=["streamlit"], max_message_size=MAX_MESSAGE_SIZE
+        )
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    async def close(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+
+    # ------------------------------------------------------------------------------
+    # Interactions; each returns the seconds until the run finished
+    # ------------------------------------------------------------------------------
+
+    async def run(self, widget_states=(), fragment_id=""):
+        """
+        Rerun the page (or one fragment) with the given widget states.
+
+        Widgets that are not passed keep their previous value on the server,
+        as they do when the browser reruns.
+        """
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_name = self.page
+        state.fragment_id = fragment_id
+        state.widget_states.widgets.extend(widget_states)
+
+        self._errors = []
+        self._finished = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        self._ws.write_message(msg.SerializeToString(), binary=True)
+        status = await asyncio.wait_for(self._finished, self.timeout)
+        elapsed = time.perf_counter() - start
+
+        if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+            raise AppError("script failed to compile")
+        if self._errors:
+            raise AppError(self._errors[0])
+        return elapsed
+
+    async def set(self, label, value):
+        """
+        Change a widget's value, e.g. a selectbox option or a slider position.
+        """
+        widget = self.widget(label)
+        state = _widget_state(widget, value)
+        return await self.run([state], widget.fragment_id)
+
+    async def click(self, label):
+        widget = self.widget(label)
+        state = _widget_state(widget, True)
+        return await self.run([state], widget.fragment_id)
+
+    async def upload(self, label, name, data, mime="text/csv"):
+        """
+        Upload ``data`` as file ``name`` through the file uploader ``label``.
+
+        The upload itself is included in the returned time.
+        """
+        widget = self.widget(label)
+        start = time.perf_counter()
+
+        request_id = str(next(self._request_ids))
+        msg = BackMsg()
+        msg.file_urls_request.request_id = request_id
+        msg.file_urls_request.session_id = self.session_id
+        msg.file_urls_request.file_names.append(name)
+        response = self._file_urls[request_id] = asyncio.get_running_loop().create_future()
+        self._ws.write_message(msg.SerializeToString(), binary=True)
+        file_urls = (await asyncio.wait_for(response, self.timeout)).file_urls[0]
+
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{name}"\r\n'
+            f"Content-Type: {mime}\r\n\r\n"
+        ).encode("utf-8") + data + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        await AsyncHTTPClient().fetch(HTTPRequest(
+            self.url + file_urls.upload_url,
+            method="PUT",
+            body=body,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            request_timeout=self.timeout,
+        ))
+
+        state = _widget_state(widget, None)
+        info = state.file_uploader_state_value.uploaded_file_info.add()
+        info.file_id = file_urls.file_id
+        info.name = name
+        info.size = len(data)
+        info.file_urls.CopyFrom(file_urls)
+        await self.run([state], widget.fragment_id)
+        return time.perf_counter() - start
+
+    def widget(self, label):
+        # Widget ids end with the user key, if one was given
+        for widget in self.widgets.values():
+            if widget.id.endswith(f"-{label}"):
+                return widget
+        for widget in self.widgets.values():
+            if widget.label.startswith(label):
+                return widget
+        raise LookupError(f"no widget labelled {label!r}")
+
+    # ------------------------------------------------------------------------------
+    # Forward messages
+    # ------------------------------------------------------------------------------
+
+    async def _read_loop(self):
+        try:
+            while True:
+                payload = await self._ws.read_message() if self._ws else None
+                if payload is None:
+                    break
+                msg = ForwardMsg()
+                msg.ParseFromString(payload)
+                self._handle(msg)
+        finally:
+            for future in [self._finished, *self._file_urls.values()]:
+                if future is not None and not future.done():
+                    future.set_exception(ConnectionError("websocket closed"))
+
+    def _handle(self, msg):
+        kind = msg.WhichOneof("type")
+        if kind == "ref_hash":
+            # The server only references messages it sent to us before; the
+            # ones we did not keep carry no widgets or errors
+            msg = self._refs.get(msg.ref_hash)
+            if msg is None:
+                return
+            kind = "delta"
+
+        if kind == "new_session":
+            self.session_id = msg.new_session.initialize.session_id
+        elif kind == "delta":
+            self._handle_delta(msg)
+        elif kind == "file_urls_response":
+            future = self._file_urls.pop(msg.file_urls_response.response_id, None)
+            if future is not None and not future.done():
+                future.set_result(msg.file_urls_response)
+        elif kind == "page_not_found":
+            self._errors.append(f"page not found: {self.page}")
+        elif kind == "script_finished":
+            if msg.script_finished in _FINISHED and self._finished is not None and not self._finished.done():
+                self._finished.set_result(msg.script_finished)
+
+    def _handle_delta(self, msg):
+        delta = msg.delta
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        element_type = element.WhichOneof("type")
+        proto = getattr(element, element_type)
+        if element_type == "exception":
+            self._errors.append(f"{proto.type}: {proto.message}")
+        elif getattr(proto, "id", ""):
+            label = getattr(proto, "label", "") or getattr(proto, "placeholder", "")
+            self.widgets[proto.id] = Widget(element_type, proto.id, label, delta.fragment_id, proto)
+        else:
+            return
+        # Only small widget and exception messages are kept for ref_hash lookups
+        if msg.hash:
+            self._refs[msg.hash] = msg
+
+
+def _widget_state(widget, value):
+    state = WidgetState(id=widget.id)
+    kind, proto = widget.kind, widget.proto
+    if kind == "button":
+        state.trigger_value = True
+    elif kind == "chat_input":
+        state.string_trigger_value.data = value
+    elif kind in ("checkbox", "toggle"):
+        state.bool_value = value
+    elif kind in ("selectbox", "radio"):
+        state.int_value = value if isinstance(value, int) else list(proto.options).index(value)
+    elif kind == "multiselect":
+        state.int_array_value.data.extend(list(proto.options).index(v) for v in value)
+    elif kind == "slider":
+        state.double_array_value.data.extend(value if isinstance(value, (list, tuple)) else [value])
+    elif kind in ("text_input", "text_area"):
+        state.string_value = value
+    elif kind == "file_uploader":
+        state.file_uploader_state_value.SetInParent()
+    else:
+        raise TypeError(f"setting {kind} widgets is not supported")
+    return state
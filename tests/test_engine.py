@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engine import articles  # noqa: E402
+from engine.cli import main, score_csv, summarize_urls  # noqa: E402
+from engine.server import _missing_option, _string_list  # noqa: E402
+from utils.resources import manager  # noqa: E402
+
+
+@pytest.mark.parametrize("value", ["hello", ["hello", 3], {"a": "b"}])
+def test_string_list_rejects_other_values(value):
+    with pytest.raises(ValueError):
+        _string_list({"texts": value}, "texts")
+
+
+def test_string_list_default_and_missing():
+    assert _string_list({}, "labels", ["positive"]) == ["positive"]
+    assert _string_list({"texts": ["a", "b"]}, "texts") == ["a", "b"]
+    with pytest.raises(ValueError):
+        _string_list({}, "texts")
+
+
+def test_missing_option_is_validated():
+    assert _missing_option({}) == "none"
+    assert _missing_option({"missing": ["fill_mean"]}) == "fill_mean"
+    with pytest.raises(ValueError, match="fill_meen"):
+        _missing_option({"missing": ["fill_meen"]})
+
+
+def test_missing_column_fails_before_scoring(tmp_path):
+    csv = tmp_path / "data.csv"
+    csv.write_text("id,text\n1,good\n")
+
+    with pytest.raises(ValueError, match="body"):
+        score_csv(csv, "body")
+    with pytest.raises(SystemExit, match="Available columns: id, text"):
+        main(["sentiment", str(csv), "--column", "body"])
+
+
+def test_batch_summarize_does_not_fill_the_shared_cache(monkeypatch):
+    monkeypatch.setattr(articles, "parse_article", lambda url: {"url": url, "summary": "..."})
+    urls = [f"https://example.com/{i}" for i in range(5)]
+
+    results = list(summarize_urls(urls, workers=2))
+
+    assert [article["url"] for article in results] == urls
+    assert not any(entry["key"].startswith("article:") for entry in manager.stats()["entries"])
+
+
+def test_sentiment_output_does_not_depend_on_chunksize(tmp_path):
+    csv = tmp_path / "data.csv"
+    csv.write_text("text,price\ngood,3\nbad,\nfine,4\n")
+    outputs = []
+    for chunksize in ("1", "5000"):
+        out = tmp_path / f"out_{chunksize}.csv"
+        main(["sentiment", str(csv), "--workers", "1", "--chunksize", chunksize, "-o", str(out)])
+        outputs.append(out.read_text())
+
+    assert outputs[0] == outputs[1]
+    assert outputs[0].splitlines()[1].startswith("good,3,")
@@ -0,0 +1,70 @@
+import io
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.images import EXIF_ORIENTATION, _prepare_image  # noqa: E402
+
+
+def _encode(image, fmt, **kwargs):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def _decode(data):
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def test_small_supported_image_is_passed_through():
+    data = _encode(Image.new("RGB", (200, 100), "red"), "PNG")
+
+    assert _prepare_image(data, max_side=1024) == (data, "image/png")
+
+
+def test_large_image_is_downscaled_to_jpeg():
+    data = _encode(Image.new("RGB", (3000, 1500), "blue"), "PNG")
+
+    out, mime = _prepare_image(data, max_side=1024)
+
+    assert mime == "image/jpeg"
+    assert _decode(out).size == (1024, 512)
+
+
+def test_transparency_is_composited_onto_white():
+    data = _encode(Image.new("RGBA", (2000, 1000), (0, 0, 0, 0)), "PNG")
+
+    out, _ = _prepare_image(data, max_side=1024)
+
+    red, green, blue = _decode(out).getpixel((10, 10))
+    assert min(red, green, blue) > 245
+
+
+def test_exif_orientation_is_applied():
+    # Stored landscape, displayed portrait (rotate 90 degrees clockwise)
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    data = _encode(Image.new("RGB", (3000, 2000), "green"), "JPEG", exif=exif)
+
+    out, mime = _prepare_image(data, max_side=1024)
+
+    image = _decode(out)
+    assert mime == "image/jpeg"
+    assert image.size == (683, 1024)
+    assert image.getexif().get(EXIF_ORIENTATION, 1) == 1
+
+
+def test_small_rotated_image_is_not_passed_through():
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    data = _encode(Image.new("RGB", (300, 200), "green"), "JPEG", exif=exif)
+
+    out, _ = _prepare_image(data, max_side=1024)
+
+    assert out != data
+    assert _decode(out).size == (200, 300)
@@ -0,0 +1,132 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.resources import ResourceManager  # noqa: E402
+
+
+class Blob:
+    """Weak-referenceable stand-in for a DataFrame."""
+
+
+def test_lru_evicts_least_recently_used():
+    manager = ResourceManager(budget_bytes=30, policy="lru")
+    manager.put("a", "a", size=10)
+    manager.put("b", "b", size=10)
+    manager.put("c", "c", size=10)
+    manager.get_or_create("a", lambda: "rebuilt")
+
+    manager.put("d", "d", size=10)
+
+    keys = [entry["key"] for entry in manager.stats()["entries"]]
+    assert sorted(keys) == ["a", "c", "d"]
+    assert manager.evictions == 1
+
+
+def test_lfu_evicts_least_frequently_used():
+    manager = ResourceManager(budget_bytes=30, policy="lfu")
+    manager.put("a", "a", size=10)
+    manager.put("b", "b", size=10)
+    manager.put("c", "c", size=10)
+    for _ in range(3):
+        manager.get_or_create("a", lambda: "rebuilt")
+    manager.get_or_create("c", lambda: "rebuilt")
+
+    manager.put("d", "d", size=10)
+
+    keys = [entry["key"] for entry in manager.stats()["entries"]]
+    assert sorted(keys) == ["a", "c", "d"]
+
+
+def test_pinned_entries_are_never_evicted_and_not_budgeted():
+    manager = ResourceManager(budget_bytes=20, policy="lru")
+    manager.get_or_create("model", lambda: "model", size=100, pin=True)
+    manager.put("a", "a", size=10)
+    manager.put("b", "b", size=10)
+    manager.put("c", "c", size=10)
+
+    stats = manager.stats()
+    assert sorted(entry["key"] for entry in stats["entries"]) == ["b", "c", "model"]
+    assert stats["used_bytes"] == 20
+    assert stats["pinned_bytes"] == 100
+
+
+def test_hit_and_miss_counters():
+    manager = ResourceManager(budget_bytes=100)
+    manager.get_or_create("a", lambda: "a")
+    manager.get_or_create("a", lambda: "a")
+    manager.get_or_create("a", lambda: "a")
+    manager.get_or_create("b", lambda: "b")
+
+    stats = manager.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_factory_returning_none_is_cached():
+    manager = ResourceManager(budget_bytes=100)
+    calls = []
+    for _ in range(3):
+        assert manager.get_or_create("none", lambda: calls.append(1), size=1) is None
+
+    assert len(calls) == 1
+    assert (manager.hits, manager.misses) == (2, 1)
+
+
+def test_concurrent_callers_build_once():
+    manager = ResourceManager(budget_bytes=100)
+    calls = []
+    barrier = threading.Barrier(8)
+    results = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    def worker():
+        barrier.wait()
+        results.append(manager.get_or_create("model", factory, size=1))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+    assert (manager.hits, manager.misses) == (7, 1)
+
+
+def test_evicted_object_still_referenced_is_reused():
+    manager = ResourceManager(budget_bytes=10)
+    held = manager.get_or_create("a", Blob, size=10)
+    manager.put("b", Blob(), size=10)
+    assert manager.stats()["retained_bytes"] == 10
+
+    assert manager.get_or_create("a", Blob, size=10) is held
+    assert manager.misses == 1
+
+
+def test_evicted_object_is_forgotten_once_collected():
+    manager = ResourceManager(budget_bytes=10)
+    manager.put("a", Blob(), size=10)
+    manager.put("b", Blob(), size=10)
+
+    assert manager.stats()["retained_bytes"] == 0
+    fresh = manager.get_or_create("a", Blob, size=10)
+    assert isinstance(fresh, Blob)
+    assert manager.misses == 1
+
+
+def test_import_does_not_load_streamlit():
+    code = "import sys, utils.resources; sys.exit('streamlit' in sys.modules)"
+    root = Path(__file__).resolve().parent.parent
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
@@ -0,0 +1,32 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_cli_process_pool_exports_worker_span_totals(tmp_path):
+    csv = tmp_path / "reviews.csv"
+    csv.write_text("text\n" + "great product\nawful service\n" * 50)
+    prom = tmp_path / "traces.prom"
+    env = {
+        **os.environ,
+        "APP_TRACING": "1",
+        "APP_TRACE_FILE": str(tmp_path / "traces.jsonl"),
+        "APP_TRACE_PROM": str(prom),
+    }
+
+    subprocess.run(
+        [sys.executable, "-m", "engine", "sentiment", str(csv), "--workers", "2",
+         "--chunksize", "20", "-o", str(tmp_path / "out.csv")],
+        cwd=ROOT, env=env, check=True, capture_output=True,
+    )
+
+    text = prom.read_text()
+    calls = re.search(r'^app_span_calls_total\{span="textblob_batch"\} (\d+)$', text, re.M)
+    items = re.search(r'^app_span_items_total\{span="textblob_batch"\} (\d+)$', text, re.M)
+    assert calls and int(calls.group(1)) == 5
+    assert items and int(items.group(1)) == 100
+    assert "# TYPE app_span_memory_delta_bytes gauge" in text
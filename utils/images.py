@@ -0,0 +1,125 @@
+"""
+Image handling for the chatbot page.
+
+Uploads are decoded, downscaled and compressed at most once per distinct file
+(keyed by a content hash) and then passed around as raw bytes. Images that are
+already small enough and in a format the models accept are passed through
+untouched.
+"""
+import base64
+import hashlib
+import io
+
+import streamlit as st
+from PIL import Image, ImageOps
+
+from utils.resources import manager
+
+# Longest side, in pixels, of images sent to the vision model
+VISION_MAX_SIDE = 1024
+JPEG_QUALITY = 85
+
+THUMBNAIL_SIZE = (256, 256)
+GALLERY_LIMIT = 12
+
+# EXIF tag telling viewers how to rotate the stored pixels (phone photos)
+EXIF_ORIENTATION = 0x0112
+
+# Formats that can be forwarded to the model without re-encoding
+PASSTHROUGH_FORMATS = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
+
+
+def content_hash(data):
+    """
+    Return a stable hex digest for a blob of bytes.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _to_rgb(image):
+    """
+    Convert to RGB, compositing any transparency onto white instead of black.
+    """
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _prepare_image(data, max_side=VISION_MAX_SIDE, quality=JPEG_QUALITY):
+    with Image.open(io.BytesIO(data)) as image:
+        fmt = image.format
+        # Rotated images are re-encoded upright, since models may ignore the tag
+        upright = image.getexif().get(EXIF_ORIENTATION, 1) == 1
+        if max(image.size) <= max_side and fmt in PASSTHROUGH_FORMATS and upright:
+            return data, PASSTHROUGH_FORMATS[fmt]
+
+        # For JPEGs this lets the decoder downscale while decoding.
+        image.draft("RGB", (max_side, max_side))
+        resized = _to_rgb(ImageOps.exif_transpose(image))
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    resized.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue(), "image/jpeg"
+
+
+def prepare_upload(uploaded_file, max_side=VISION_MAX_SIDE):
+    """
+    Return ``(bytes, mime_type)`` for an uploaded image, sized for the vision model.
+
+    The result is cached by content hash in the shared resource manager, so
+    repeated messages with the same upload do not decode or encode it again.
+    """
+    data = uploaded_file.getvalue()
+    key = f"image:{content_hash(data)}:{max_side}"
+    return manager.get_or_create(key, lambda: _prepare_image(data, max_side))
+
+
+def image_content_part(data, mime_type):
+    """
+    Build an OpenAI-style ``image_url`` content part from raw image bytes.
+    """
+    encoded = base64.b64encode(data).decode("ascii")
+    return {
+        "type": "image_url",
+        "image_url": {"url": f"data:{mime_type};base64,{encoded}"},
+    }
+
+
+def add_to_gallery(image, prompt):
+    """
+    Keep a JPEG thumbnail of a generated PIL image in the session gallery.
+
+    Only the encoded thumbnail is stored, so a session holds a few hundred KB
+    at most instead of a dozen full-resolution images.
+    """
+    thumbnail = _to_rgb(image)
+    thumbnail.thumbnail(THUMBNAIL_SIZE)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+
+    gallery = st.session_state.setdefault("image_gallery", [])
+    gallery.insert(0, {"prompt": prompt, "thumbnail": buffer.getvalue()})
+    del gallery[GALLERY_LIMIT:]
+
+
+def show_gallery():
+    """
+    Render the thumbnails of previously generated images, newest first.
+    """
+    gallery = st.session_state.get("image_gallery", [])
+    if not gallery:
+        return
+    st.write("### Generated Images")
+    st.image(
+        [item["thumbnail"] for item in gallery],
+        caption=[item["prompt"] for item in gallery],
+        width=THUMBNAIL_SIZE[0],
+    )
@@ -0,0 +1,49 @@
+"""
+Deferred imports for heavy optional stacks.
+
+``lazy_import("plotly.express")`` returns a module placeholder that performs
+the real import the first time one of its attributes is used, so a page only
+pays for a library when the widget that needs it actually runs.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module placeholder that imports the real module on first attribute access.
+    """
+
+    def _load(self):
+        module = self.__dict__.get("_lazy_module")
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            # Copy the real namespace over so later lookups skip __getattr__
+            self.__dict__.update(module.__dict__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """
+    Return ``name`` as a lazily loaded module.
+
+    If the module was already imported, the real module is returned directly.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def is_loaded(name):
+    """
+    Tell whether ``name`` has really been imported in this process.
+    """
+    return name in sys.modules
@@ -0,0 +1,247 @@
+"""
+Process-wide cache for heavy objects shared between sessions.
+
+Models, loaded DataFrames, parsed articles and PDF text are registered here
+instead of being cached per session. Every entry carries an approximate size
+in bytes and the manager evicts entries (LRU or LFU) once the global budget is
+exceeded. Models are pinned instead: they are never evicted and do not count
+against the budget, so one large upload cannot push a model out.
+
+An evicted object that a session still references is not freed, so the
+manager keeps a weak reference to it. Its size is reported as retained, and a
+later lookup reuses it instead of building a second copy.
+
+Objects handed out by the manager are shared by every session, so callers must
+treat them as read-only (e.g. ``df = shared.drop(columns=...)`` instead of
+``shared.drop(..., inplace=True)``).
+
+Configuration:
+    APP_MEMORY_BUDGET_MB  global budget in MiB (default 2048)
+    APP_CACHE_POLICY      "lru" (default) or "lfu"
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from utils.lazy import lazy_import
+
+# Only content_key needs Streamlit; the headless engine uses the manager without it
+st = lazy_import("streamlit")
+
+DEFAULT_BUDGET_MB = 2048
+
+# Returned by _lookup on a miss, so a factory may legitimately return None
+_MISSING = object()
+
+
+def estimate_size(obj):
+    """
+    Return an approximate size of ``obj`` in bytes.
+    """
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    # pandas DataFrame / Series
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        return int(obj.memory_usage(deep=True).sum())
+    if hasattr(obj, "memory_usage"):
+        return int(obj.memory_usage(deep=True))
+    # numpy arrays
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    # transformers pipelines and torch modules
+    model = getattr(obj, "model", obj)
+    if hasattr(model, "parameters"):
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "pinned", "hits", "created", "last_access")
+
+    def __init__(self, value, size, pinned=False):
+        self.value = value
+        self.size = size
+        self.pinned = pinned
+        self.hits = 0
+        self.created = self.last_access = time.time()
+
+
+class ResourceManager:
+    """
+    Thread-safe, size-bounded cache with LRU or LFU eviction.
+    """
+
+    def __init__(self, budget_bytes, policy="lru"):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown cache policy: {policy!r}")
+        self.budget_bytes = budget_bytes
+        self.policy = policy
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per key being built, so concurrent sessions load it only once
+        self._build_locks = {}
+        # key -> (weak reference, size) of evicted objects that are still alive
+        self._evicted = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def used_bytes(self):
+        return sum(entry.size for entry in self._entries.values() if not entry.pinned)
+
+    def get_or_create(self, key, factory, size=None, pin=False):
+        """
+        Return the object cached under ``key``, building it with ``factory()`` on a miss.
+
+        ``size`` overrides the estimated size in bytes. ``pin`` keeps the entry
+        out of eviction and the budget (used for models).
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        try:
+            with build_lock:
+                # Another session may have built it while we waited
+                value = self._lookup(key, count_miss=True)
+                if value is _MISSING:
+                    value = factory()
+                    self.put(key, value, size, pin=pin)
+        finally:
+            with self._lock:
+                self._build_locks.pop(key, None)
+        return value
+
+    def _lookup(self, key, count_miss=False):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._revive(key)
+            if entry is None:
+                if count_miss:
+                    self.misses += 1
+                return _MISSING
+            entry.hits += 1
+            entry.last_access = time.time()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key, value, size=None, pin=False):
+        """
+        Store ``value`` under ``key`` and evict other entries if over budget.
+        """
+        entry = _Entry(value, estimate_size(value) if size is None else size, pin)
+        with self._lock:
+            self._evicted.pop(key, None)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict(keep=key)
+
+    def _evict(self, keep):
+        used = self.used_bytes
+        while used > self.budget_bytes:
+            candidates = [k for k, entry in self._entries.items() if k != keep and not entry.pinned]
+            if not candidates:
+                break
+            if self.policy == "lru":
+                victim = candidates[0]
+            else:
+                victim = min(candidates, key=lambda k: (self._entries[k].hits, self._entries[k].last_access))
+            entry = self._entries.pop(victim)
+            used -= entry.size
+            self.evictions += 1
+            self._retain(victim, entry)
+
+    def _retain(self, key, entry):
+        evicted = self._evicted
+
+        def forget(ref):
+            # Runs when the object is collected; never takes the lock
+            if evicted.get(key, (None,))[0] is ref:
+                evicted.pop(key, None)
+
+        try:
+            evicted[key] = (weakref.ref(entry.value, forget), entry.size)
+        except TypeError:
+            pass  # str, bytes, dict, ... cannot be weakly referenced
+
+    def _revive(self, key):
+        ref, size = self._evicted.pop(key, (None, 0))
+        value = ref() if ref is not None else None
+        if value is None:
+            return None
+        entry = self._entries[key] = _Entry(value, size)
+        self._evict(keep=key)
+        return entry
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._evicted.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._evicted.clear()
+
+    def stats(self):
+        """
+        Return counters and a per-entry breakdown, largest first.
+        """
+        with self._lock:
+            entries = [
+                {
+                    "key": key,
+                    "bytes": entry.size,
+                    "pinned": entry.pinned,
+                    "hits": entry.hits,
+                    "age_s": time.time() - entry.created,
+                }
+                for key, entry in self._entries.items()
+            ]
+            retained = sum(size for ref, size in list(self._evicted.values()) if ref() is not None)
+            lookups = self.hits + self.misses
+            return {
+                "policy": self.policy,
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": sum(e["bytes"] for e in entries if not e["pinned"]),
+                "pinned_bytes": sum(e["bytes"] for e in entries if e["pinned"]),
+                "retained_bytes": retained,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": sorted(entries, key=lambda e: e["bytes"], reverse=True),
+            }
+
+
+manager = ResourceManager(
+    budget_bytes=int(float(os.environ.get("APP_MEMORY_BUDGET_MB", DEFAULT_BUDGET_MB)) * 2**20),
+    policy=os.environ.get("APP_CACHE_POLICY", "lru").lower(),
+)
+
+
+def content_key(uploaded_file):
+    """
+    Return a content hash for an uploaded file, so identical uploads from
+    different sessions share one cache entry.
+
+    The digest is remembered per upload to avoid rehashing on every rerun.
+    """
+    digests = st.session_state.setdefault("_upload_digests", {})
+    digest = digests.get(uploaded_file.file_id)
+    if digest is None:
+        digest = digests[uploaded_file.file_id] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    return digest
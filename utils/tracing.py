@@ -0,0 +1,347 @@
+"""
+Lightweight tracing for the hot paths of the pages.
+
+Spans record wall time, CPU time of the thread running the span, resident
+memory delta and the number of rows/items processed. They are collected per
+rerun and per session for the developer panel, appended to a JSONL file and
+aggregated into a Prometheus textfile.
+
+Only the process that imported this module first writes the textfile. Worker
+processes (see ``engine.batch``) hand their totals back with ``take_totals``
+and the parent adds them with ``merge_totals``.
+
+Tracing is off unless ``APP_TRACING=1``. When it is off, ``traced`` returns the
+function unchanged and ``trace`` returns a shared no-op span, so instrumented
+code runs at practically full speed.
+
+Usage:
+    @traced("load_data", items=len)
+    def load_data(file): ...
+
+    with trace("render_chart", items=len(df)):
+        ...
+"""
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from utils.lazy import is_loaded, lazy_import
+from utils.resources import manager
+
+# Not imported eagerly so the headless engine can trace without Streamlit
+st = lazy_import("streamlit")
+
+try:
+    import psutil
+except ImportError:  # optional, /proc or resource are used instead
+    psutil = None
+
+ENABLED = os.environ.get("APP_TRACING", "0") == "1"
+JSONL_PATH = os.environ.get("APP_TRACE_FILE", "traces.jsonl")
+PROMETHEUS_PATH = os.environ.get("APP_TRACE_PROM", "traces.prom")
+# Minimum seconds between Prometheus textfile rewrites
+PROMETHEUS_INTERVAL = float(os.environ.get("APP_TRACE_PROM_INTERVAL", "10"))
+
+_SESSION_KEY = "_tracing"
+# Most recent spans kept per session for the developer panel
+SESSION_LIMIT = 2000
+_lock = threading.Lock()
+# Process-wide totals per span name, exported to the Prometheus textfile
+_totals = {}
+_last_prometheus_write = 0.0
+# Forked workers inherit this, so they can tell they are not the writer
+_WRITER_PID = os.getpid()
+
+
+def _rss_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # Peak rather than current RSS, but still useful as a trend
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _script_run_ctx():
+    if not is_loaded("streamlit"):
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True)
+
+
+def _session_state(ctx):
+    """
+    Return this session's tracing state, starting a new per-rerun buffer
+    whenever a new script run (full or fragment) has begun.
+    """
+    state = st.session_state.setdefault(_SESSION_KEY, {"rerun": [], "session": [], "run": None})
+    # Streamlit replaces this set at the start of every run, so its identity
+    # marks the run; keeping a reference stops the id from being reused.
+    run = ctx.widget_ids_this_run
+    if state.get("run") is not run:
+        state["run"] = run
+        state["rerun"] = []
+    return state
+
+
+class Span:
+    """
+    A single timed section. Set ``items`` inside the block if the count is
+    only known once the work is done.
+    """
+
+    def __init__(self, name, items=None):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self._rss = _rss_bytes()
+        # Per thread: the server runs every session in one process
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = {
+            "span": self.name,
+            "timestamp": time.time(),
+            "wall_s": time.perf_counter() - self._wall,
+            "cpu_s": time.thread_time() - self._cpu,
+            "mem_delta_bytes": _rss_bytes() - self._rss,
+            "items": self.items,
+            "error": exc_type.__name__ if exc_type else None,
+        }
+        _record(record)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def trace(name, items=None):
+    """
+    Context manager timing the enclosed block as span ``name``.
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, items)
+
+
+def traced(name=None, items=None):
+    """
+    Decorator timing every call of the wrapped function.
+
+    ``items`` is an optional callable applied to the return value to get the
+    number of rows/items processed, e.g. ``items=len``.
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(span_name) as span:
+                result = func(*args, **kwargs)
+                if items is not None:
+                    span.items = items(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _add_totals(span, calls, wall_s, cpu_s, mem_delta_bytes, items):
+    total = _totals.setdefault(
+        span,
+        {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "mem_delta_bytes": 0, "items": 0},
+    )
+    total["calls"] += calls
+    total["wall_s"] += wall_s
+    total["cpu_s"] += cpu_s
+    total["mem_delta_bytes"] += mem_delta_bytes
+    total["items"] += items
+
+
+def _record(record):
+    with _lock:
+        _add_totals(
+            record["span"], 1, record["wall_s"], record["cpu_s"],
+            record["mem_delta_bytes"], record["items"] or 0,
+        )
+
+        if JSONL_PATH:
+            with open(JSONL_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    ctx = _script_run_ctx()
+    if ctx is not None:
+        state = _session_state(ctx)
+        state["rerun"].append(record)
+        state["session"].append(record)
+        del state["session"][:-SESSION_LIMIT]
+
+    _maybe_write_prometheus()
+
+
+def take_totals():
+    """
+    Return the span totals of this process and reset them.
+
+    Called in worker processes to hand their totals to the parent.
+    """
+    global _totals
+    with _lock:
+        totals, _totals = _totals, {}
+    return totals
+
+
+def merge_totals(totals):
+    """
+    Add span totals returned by ``take_totals`` in a worker process.
+    """
+    with _lock:
+        for span, values in totals.items():
+            _add_totals(span, **values)
+    _maybe_write_prometheus()
+
+
+def _is_writer():
+    return os.getpid() == _WRITER_PID and multiprocessing.parent_process() is None
+
+
+def _maybe_write_prometheus():
+    # Runs on a timer from _record so the CLI and HTTP server export too
+    global _last_prometheus_write
+    if not PROMETHEUS_PATH or not _is_writer():
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_prometheus_write < PROMETHEUS_INTERVAL:
+            return
+        _last_prometheus_write = now
+    write_prometheus()
+
+
+def write_prometheus(path=PROMETHEUS_PATH):
+    """
+    Write the process-wide span totals in Prometheus textfile format.
+
+    The file is replaced atomically so a node exporter never reads it half written.
+    Does nothing in worker processes, whose totals are merged into the parent.
+    """
+    if not _is_writer():
+        return
+    metrics = [
+        ("calls", "app_span_calls_total", "counter", "Number of times the span ran."),
+        ("wall_s", "app_span_wall_seconds_total", "counter", "Wall-clock time spent in the span."),
+        ("cpu_s", "app_span_cpu_seconds_total", "counter", "CPU time of the thread running the span."),
+        # RSS deltas can be negative, so the sum is not monotonic
+        ("mem_delta_bytes", "app_span_memory_delta_bytes", "gauge", "Sum of RSS deltas across calls."),
+        ("items", "app_span_items_total", "counter", "Rows or items processed by the span."),
+    ]
+    with _lock:
+        totals = {span: dict(values) for span, values in _totals.items()}
+
+    lines = []
+    for key, metric, kind, help_text in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for span, values in sorted(totals.items()):
+            lines.append(f'{metric}{{span="{span}"}} {values[key]}')
+
+    resources = manager.stats()
+    resource_metrics = [
+        ("hits", "app_resource_hits_total", "counter", "Shared resource cache hits."),
+        ("misses", "app_resource_misses_total", "counter", "Shared resource cache misses."),
+        ("evictions", "app_resource_evictions_total", "counter", "Shared resource cache evictions."),
+        ("used_bytes", "app_resource_used_bytes", "gauge", "Approximate bytes held by the shared cache."),
+        ("pinned_bytes", "app_resource_pinned_bytes", "gauge", "Approximate bytes of pinned entries (models)."),
+        ("retained_bytes", "app_resource_retained_bytes", "gauge", "Evicted bytes still referenced elsewhere."),
+        ("budget_bytes", "app_resource_budget_bytes", "gauge", "Memory budget of the shared cache."),
+    ]
+    for key, metric, kind, help_text in resource_metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric} {resources[key]}")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _summarize(records):
+    import pandas as pd
+
+    df = pd.DataFrame(records)
+    df["items"] = df["items"].fillna(0)
+    summary = df.groupby("span").agg(
+        calls=("span", "size"),
+        wall_s=("wall_s", "sum"),
+        cpu_s=("cpu_s", "sum"),
+        mem_delta_mb=("mem_delta_bytes", lambda b: b.sum() / 2**20),
+        items=("items", "sum"),
+    )
+    return summary.sort_values("wall_s", ascending=False)
+
+
+def developer_panel():
+    """
+    Show the spans of the current rerun and the session totals in the sidebar.
+
+    Call once at the end of a page. The per-rerun buffer is reset when the next
+    run starts, so spans from fragment reruns or a run that raised early never
+    show up under a later rerun.
+    """
+    if not ENABLED:
+        return
+    state = _session_state(_script_run_ctx())
+
+    with st.sidebar.expander("Developer: performance"):
+        if state["rerun"]:
+            st.write("**This rerun**")
+            st.dataframe(_summarize(state["rerun"]))
+        else:
+            st.write("No traced work in this rerun.")
+        if state["session"]:
+            st.write("**This session**")
+            st.dataframe(_summarize(state["session"]))
+
+        resources = manager.stats()
+        st.write(
+            f"**Shared resources** ({resources['policy'].upper()}): "
+            f"{resources['used_bytes'] / 2**20:.1f} / {resources['budget_bytes'] / 2**20:.0f} MiB, "
+            f"{resources['pinned_bytes'] / 2**20:.1f} MiB pinned, "
+            f"{resources['retained_bytes'] / 2**20:.1f} MiB evicted but still referenced, "
+            f"{resources['hits']} hits, {resources['misses']} misses, "
+            f"{resources['evictions']} evictions"
+        )
+        if resources["entries"]:
+            st.dataframe(resources["entries"])
+
+
+if ENABLED and PROMETHEUS_PATH:
+    # Flush the final totals, whatever the interval, when the process exits
+    atexit.register(write_prometheus)